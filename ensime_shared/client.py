@@ -5,26 +5,36 @@ import json
 import logging
 import os
 import shutil
-import sys
+import socket
 import tempfile
 import time
 from subprocess import PIPE, Popen
-from threading import Thread
+from threading import current_thread, Lock, Thread
 
 import websocket
 
+from .codec import get_codec
+from .completion import CompletionCache, narrow
 from .config import feedback, gconfig, LOG_FORMAT
 from .debugger import DebuggerClient
 from .errors import InvalidJavaPathError
+from .lanes import LaneQueue
 from .protocol import ProtocolHandler, ProtocolHandlerV1, ProtocolHandlerV2
+from .recorder import SessionRecorder
+from .responses import Message, peek_call_id, ResponseFuture
+from .stats import Stats
 from .typecheck import TypecheckHandler
+from .usages import USAGES_BATCH
 from .util import catch, Pretty, Util
 
-# Queue depends on python version
-if sys.version_info > (3, 0):
-    from queue import Queue
-else:
-    from Queue import Queue
+RECONNECT_BACKOFF = 0.05
+"""Initial delay (seconds) of the receiver while waiting for a connection."""
+
+POLLER_JOIN_TIMEOUT = 1.0
+"""Seconds that ``teardown()`` waits for the receiver thread to finish."""
+
+UNQUEUE_BUDGET = 0.05
+"""Seconds that handling received messages may take per tick, at most."""
 
 
 class EnsimeClient(TypecheckHandler, DebuggerClient, ProtocolHandler):
@@ -39,11 +49,15 @@ class EnsimeClient(TypecheckHandler, DebuggerClient, ProtocolHandler):
 
     Communication with the server is done over a websocket (`self.ws`). Messages
     are sent to the server in the calling thread, while messages are received on
-    a separate background thread and enqueued in `self.queue` upon receipt.
+    a separate background thread, decoded and enqueued in `self.queue` upon
+    receipt, by priority. Only their handlers, which touch the editor, run on
+    the main thread.
 
     Each call to the server contains a `callId` field with an integer ID,
     generated from `self.call_id`. Responses echo back the `callId` field so
-    that appropriate handlers can be invoked.
+    that appropriate handlers can be invoked. Commands that need to block for
+    their reply ask ``send_request`` for a ``ResponseFuture``, registered in
+    `self.pending`; its response bypasses `self.queue` entirely.
 
     Responses also contain a `typehint` field in their `payload` field, which
     contains the type of the response. This is used to key into `self.handlers`,
@@ -101,10 +115,41 @@ class EnsimeClient(TypecheckHandler, DebuggerClient, ProtocolHandler):
         self.refactorings = {}
 
         # Queue for messages received from the ensime server.
-        self.queue = Queue()
+        self.queue = LaneQueue()
+        self.codec = get_codec()
+        self.unqueue_budget = UNQUEUE_BUDGET
+        self.dropped_notes = 0
+        # Futures for requests whose caller blocks on the reply, by call ID
+        self.pending = {}
+        # Call IDs of cancelled requests, their replies are dropped unread
+        self.superseded = set()
+        # Time each request still expecting a reply was sent, by call ID
+        self.awaiting_reply = {}
+        # Called from any thread when a request is sent or a message queued
+        self.wakeup = None
+        self._pending_lock = Lock()
         self.suggestions = None
+        self.suggestions_truncated = False
         self.completion_timeout = 10  # seconds
-        self.completion_started = False
+        self.completion_max_results = 100
+        self.completion_cache = CompletionCache()
+        self.usage_list = None  # Usages being shown in the quickfix list
+        self.package_tree = None  # Shown in the package inspector
+        self.completion_future = None
+        # (site, seed) the in-flight completion request is for
+        self.completion_request = None
+        # Completion site being completed, see complete_func
+        self.completion_site = None
+        self.request_timeout = 10  # seconds
+
+        self.stats = Stats()
+        """Latency and throughput metrics of requests and responses"""
+
+        self.recorder = None
+        """Records the websocket traffic when ``ENSIME_VIM_RECORD`` is set"""
+        if os.environ.get('ENSIME_VIM_RECORD') and os.path.isdir(launcher.config['cache-dir']):
+            self.recorder = SessionRecorder.in_dir(launcher.config['cache-dir'])
+            self.log.info('Recording session to %s', self.recorder.path)
 
         self.full_types_enabled = False
         """Whether fully-qualified types are displayed by inspections or not"""
@@ -119,37 +164,105 @@ class EnsimeClient(TypecheckHandler, DebuggerClient, ProtocolHandler):
         self.debug_thread_id = None
         self.running = True
 
-        thread = Thread(name='queue-poller', target=self.queue_poll)
-        thread.daemon = True
-        thread.start()
+        self.poller = Thread(name='queue-poller', target=self.queue_poll)
+        self.poller.daemon = True
+        self.poller.start()
 
     def queue_poll(self, sleep_t=0.5):
         """Put new messages on the queue as they arrive. Blocking in a thread.
 
-        Value of sleep is low to improve responsiveness.
+        ``recv`` blocks until the server sends a frame, so messages are enqueued
+        as soon as they arrive. The loop only sleeps while there is no usable
+        connection, backing off exponentially up to ``sleep_t`` seconds.
         """
-        connection_alive = True
+        backoff = RECONNECT_BACKOFF
 
         while self.running:
-            if self.ws:
-                def logger_and_close(msg):
-                    self.log.error('Websocket exception', exc_info=True)
-                    if not self.running:
-                        # Tear down has been invoked
-                        # Prepare to exit the program
-                        connection_alive = False  # noqa: F841
-                    else:
-                        if not self.number_try_connection:
-                            # Stop everything.
-                            self.teardown()
-                            self._display_ws_warning()
-
-                with catch(websocket.WebSocketException, logger_and_close):
-                    result = self.ws.recv()
-                    self.queue.put(result)
-
-            if connection_alive:
-                time.sleep(sleep_t)
+            ws = self.ws
+            if not ws:
+                time.sleep(backoff)
+                backoff = min(backoff * 2, sleep_t)
+                continue
+
+            try:
+                result = ws.recv()
+            except (websocket.WebSocketException, socket.error):
+                if not self.running:
+                    # Tear down has been invoked, the socket was closed under us
+                    break
+                self.log.error('Websocket exception', exc_info=True)
+                if not self.number_try_connection:
+                    # Stop everything.
+                    self.teardown()
+                    self._display_ws_warning()
+                    break
+                time.sleep(backoff)
+                backoff = min(backoff * 2, sleep_t)
+            else:
+                backoff = RECONNECT_BACKOFF
+                self._receive(result)
+
+    def _receive(self, frame):
+        """Decode a received frame, then resolve the future waiting for it or
+        enqueue it.
+
+        Replies to superseded requests are dropped before being decoded.
+        """
+        if self.recorder:
+            self.recorder.received(frame)
+
+        if self.superseded and self._drop_superseded(peek_call_id(frame)):
+            return
+
+        message = self.decode_frame(frame)
+        if not message:
+            return
+
+        with self._pending_lock:
+            future = self.pending.pop(message.call_id, None)
+        if future:
+            self.stats.response_received(message.call_id)
+            future.set_result(message)
+        elif not self._drop_superseded(message.call_id):  # Cancelled while decoding?
+            self.queue.put(message)
+            if self.wakeup:
+                self.wakeup()
+
+    def _drop_superseded(self, call_id):
+        """Whether ``call_id`` is that of a superseded request, forgotten then."""
+        with self._pending_lock:
+            if call_id not in self.superseded:
+                return False
+            self.superseded.discard(call_id)
+            self.awaiting_reply.pop(call_id, None)
+        self.stats.request_dropped(call_id)
+        self.log.debug('Dropped reply to superseded request %s', call_id)
+        return True
+
+    def decode_frame(self, frame):
+        """Decode and validate a frame received from the server.
+
+        Returns:
+            Optional[Message]: The message, ``None`` if the frame carries
+            nothing to handle.
+        """
+        self.log.debug('decode_frame: received\n%s', frame)
+        if not frame or frame == "nil":
+            self.log.debug('decode_frame: nil or None received')
+            return None
+
+        started = time.time()
+        try:
+            data = self.codec.loads(frame)
+            payload = data["payload"]
+            typehint = payload["typehint"] if payload else None
+        except (ValueError, TypeError, KeyError):
+            self.log.error('decode_frame: invalid frame\n%s', frame, exc_info=True)
+            return None
+
+        self.stats.response_decoded(typehint, time.time() - started)
+        # Watch out, it may not have callId
+        return Message(data.get("callId"), typehint, payload)
 
     def setup(self, quiet=False, bootstrap_server=False):
         """Check the classpath and connect to the server if necessary."""
@@ -197,6 +310,8 @@ class EnsimeClient(TypecheckHandler, DebuggerClient, ProtocolHandler):
                 self.ws.send(msg + "\n")
 
         self.log.debug('send: in')
+        if self.recorder:
+            self.recorder.sent(msg)
         if self.running and self.ws:
             with catch(websocket.WebSocketException, reconnect):
                 self.log.debug('send: sending JSON on WebSocket')
@@ -227,6 +342,7 @@ class EnsimeClient(TypecheckHandler, DebuggerClient, ProtocolHandler):
                                self.ensime_server, options)
                 self.ws = websocket.create_connection(self.ensime_server, **options)
             if self.ws:
+                self.ensime.mark_connected()
                 self.send_request({"typehint": "ConnectionInfoReq"})
         else:
             # If it hits this, number_try_connection is 0
@@ -243,8 +359,32 @@ class EnsimeClient(TypecheckHandler, DebuggerClient, ProtocolHandler):
         self.log.debug('teardown: in')
         self.running = False
         self.shutdown_server()
+        self.close_connection()
+        if self.recorder:
+            self.recorder.close()
         shutil.rmtree(self.tmp_diff_folder, ignore_errors=True)
 
+    def close_connection(self):
+        """Close the websocket and stop the receiver thread.
+
+        Aborting the socket wakes up the receiver blocked in ``recv``, which
+        then notices that the client is no longer running and exits.
+        """
+        ws = self.ws
+        if not ws:
+            return
+
+        self.log.debug('close_connection: in')
+        if self.ensime:
+            self.ensime.mark_connected(False)
+        with catch((websocket.WebSocketException, socket.error)):
+            ws.abort()
+        if self.poller is not current_thread():
+            self.poller.join(POLLER_JOIN_TIMEOUT)
+        with catch((websocket.WebSocketException, socket.error)):
+            ws.shutdown()
+        self.ws = None
+
     def send_at_position(self, what, useSelection, where="range"):
         """Ask the server to perform an operation on a range (sometimes named point)
 
@@ -280,21 +420,38 @@ class EnsimeClient(TypecheckHandler, DebuggerClient, ProtocolHandler):
 
     def get_position(self, row, col):
         """Get char position in all the text from row and column."""
-        result = col
         self.log.debug('%s %s', row, col)
-        lines = self.editor.getlines()[:row - 1]
-        result += sum([len(l) + 1 for l in lines])
+        result = self.editor.line_offsets().offset(row, col)
         self.log.debug(result)
         return result
 
     def open_decl_for_inspector_symbol(self):
         self.log.debug('open_decl_for_inspector_symbol: in')
         lineno = self.editor.cursor()[0]
-        symbol = self.editor.symbol_for_inspector_line(lineno)
-        self.symbol_by_name([symbol])
-        self.unqueue(should_wait=True)
+        node = self.package_tree.node_at(lineno) if self.package_tree else None
+        if not node:
+            return
+        future = self.symbol_by_name([node.fqn], future=True)
+        if future:
+            self.wait_for(future, self.request_timeout)
+
+    def toggle_inspector_node(self):
+        """Expand or collapse the member under the cursor in the package inspector."""
+        if not self.package_tree:
+            return
+        lineno = self.editor.cursor()[0]
+        change = self.package_tree.toggle(lineno)
+        if change:
+            self.editor.replace_lines(*change)
 
-    def symbol_by_name(self, args, range=None):
+    def symbol_by_name(self, args, range=None, future=False):
+        """Open the declaration of a symbol, given its fully-qualified name.
+
+        Args:
+            args (List[str]): Name of the type, and optionally of a member.
+            future (bool): Whether the caller is going to block for the reply,
+                see :meth:`send_request`. Otherwise it is handled on a tick.
+        """
         self.log.debug('symbol_by_name: in')
         if not args:
             self.editor.raw_message('Must provide a fully-qualifed symbol name')
@@ -310,16 +467,18 @@ class EnsimeClient(TypecheckHandler, DebuggerClient, ProtocolHandler):
         }
         if len(args) == 2:
             req["memberName"] = args[1]
-        self.send_request(req)
+        return self.send_request(req, future=future)
 
     def complete(self, row, col):
         self.log.debug('complete: in')
         pos = self.get_position(row, col)
-        self.send_request({"point": pos, "maxResults": 100,
-                           "typehint": "CompletionsReq",
-                           "caseSens": True,
-                           "fileInfo": self._file_info(),
-                           "reload": False})
+        return self.send_request({"point": pos,
+                                  "maxResults": self.completion_max_results,
+                                  "typehint": "CompletionsReq",
+                                  "caseSens": True,
+                                  "fileInfo": self._file_info(),
+                                  "reload": False},
+                                 future=True)
 
     def send_at_point(self, what, row, col):
         """Ask the server to perform an operation at a given point."""
@@ -329,6 +488,25 @@ class EnsimeClient(TypecheckHandler, DebuggerClient, ProtocolHandler):
              "file": self._file_info(),
              "point": pos})
 
+    def show_stats(self, args, range=None):
+        """Show request latencies and response handling times in a split.
+
+        With a ``json`` argument, dump them as JSON in the project's cache
+        directory instead.
+        """
+        self.log.debug('show_stats: in')
+        if 'json' in args:
+            path = os.path.join(self.launcher.config['cache-dir'], 'ensime-vim-stats.json')
+            Util.write_file(path, json.dumps(self.stats.to_dict(), indent=2, sort_keys=True))
+            self.editor.raw_message(feedback["stats_written"].format(path))
+            return
+
+        report = self.stats.report()
+        opts = {'buftype': 'nofile', 'bufhidden': 'wipe',
+                'buflisted': False, 'swapfile': False}
+        self.editor.split_window(None, size=min(len(report) + 1, 20), bufopts=opts)
+        self.editor.append(report)
+
     def do_toggle_teardown(self, args, range=None):
         self.log.debug('do_toggle_teardown: in')
         self.toggle_teardown = not self.toggle_teardown
@@ -444,6 +622,28 @@ class EnsimeClient(TypecheckHandler, DebuggerClient, ProtocolHandler):
                 "false_resp_msg": "Not a valid symbol under the cursor"}
         self.send_at_point("UsesOfSymbol", row, col)
 
+    def more_usages(self):
+        """Show more of the usages left out of the quickfix list."""
+        usages = self.usage_list
+        if usages and usages.truncated:
+            usages.more()
+            self.display_more_usages()
+            if usages.pending and self.wakeup:
+                self.wakeup()
+
+    def display_more_usages(self):
+        """Append the next batch of usages being shown to the quickfix list."""
+        usages = self.usage_list
+        if usages and usages.pending:
+            self.editor.append_quickfix_list(usages.take(USAGES_BATCH), usages.title)
+            self.report_truncated_usages()
+
+    def report_truncated_usages(self):
+        usages = self.usage_list
+        if usages.truncated:
+            self.editor.raw_message(
+                feedback["usages_truncated"].format(usages.shown, usages.total))
+
     def doc_browse(self, args, range=None):
         """Browse doc of whatever at cursor."""
         self.log.debug('browse: in')
@@ -566,17 +766,75 @@ class EnsimeClient(TypecheckHandler, DebuggerClient, ProtocolHandler):
             self.editor.edit(self.editor.path())
             self.editor.doautocmd('BufReadPre', 'BufRead', 'BufEnter')
 
-    def send_request(self, request):
-        """Send a request to the server."""
+    def send_request(self, request, future=False):
+        """Send a request to the server.
+
+        Args:
+            request (dict): The request, with its ``typehint``.
+            future (bool): Whether the caller is going to block for the reply.
+
+        Returns:
+            The ``callId`` of the request, or a :class:`ResponseFuture` to pass
+            to :meth:`wait_for` if ``future`` is true.
+        """
         self.log.debug('send_request: in')
 
-        message = {'callId': self.call_id, 'req': request}
+        call_id = self.call_id
+        self.call_id += 1
+        handle = None
+        # Register before sending, the reply may arrive at any moment
+        with self._pending_lock:
+            self.awaiting_reply[call_id] = time.time()
+            if future:
+                handle = self.pending[call_id] = ResponseFuture(call_id)
+
+        message = {'callId': call_id, 'req': request}
         self.log.debug('send_request: %s', Pretty(message))
+        self.stats.request_sent(call_id, request.get('typehint'))
         self.send(json.dumps(message))
+        if self.wakeup:
+            self.wakeup()
 
-        call_id = self.call_id
-        self.call_id += 1
-        return call_id
+        return handle if future else call_id
+
+    def wait_for(self, future, timeout):
+        """Block until the reply to a request arrives, then handle it.
+
+        Only the reply to this request is waited for; other messages stay in
+        the queue and are handled on the next tick as usual.
+
+        Args:
+            future (ResponseFuture): As returned by :meth:`send_request`.
+            timeout (float): Seconds to wait for the reply, at most.
+
+        Returns:
+            bool: Whether the reply arrived and was handled in time.
+        """
+        future.result(timeout)
+        with self._pending_lock:
+            self.pending.pop(future.call_id, None)
+
+        # Checked again under the lock, it may have been resolved meanwhile
+        message = future.result(0)
+        if message is None:
+            self.log.warning('wait_for: no reply from server for %ss', timeout)
+            return False
+
+        self._dispatch(message)
+        return True
+
+    def cancel_request(self, future):
+        """Stop waiting for the reply to a request.
+
+        If it's still to come, the reply will be dropped on receipt without
+        being decoded or handled.
+        """
+        with self._pending_lock:
+            if self.pending.pop(future.call_id, None) and not future.done():
+                self.superseded.add(future.call_id)
+            else:
+                self.awaiting_reply.pop(future.call_id, None)
+                self.stats.request_dropped(future.call_id)
 
     def buffer_leave(self, filename):
         """User is changing of buffer."""
@@ -588,43 +846,94 @@ class EnsimeClient(TypecheckHandler, DebuggerClient, ProtocolHandler):
     def type_check(self, filename):
         """Update type checking when user saves buffer."""
         self.log.debug('type_check: in')
-        self.editor.clean_errors()
+        # Notes on display are kept, the new ones are rendered as a diff
+        self.completion_cache.clear()
         self.send_request(
             {"typehint": "TypecheckFilesReq",
              "files": [self.editor.path()]})
 
-    def unqueue(self, timeout=10, should_wait=False):
-        """Unqueue all the received ensime responses for a given file."""
-        start, now = time.time(), time.time()
-        wait = self.queue.empty() and should_wait
+    def unqueue(self, budget=None):
+        """Handle received messages for ``budget`` seconds at most.
 
-        while (not self.queue.empty() or wait) and (now - start) < timeout:
-            if wait and self.queue.empty():
-                time.sleep(0.25)
-                now = time.time()
-            else:
-                result = self.queue.get(False)
-                self.log.debug('unqueue: result received\n%s', result)
-                if result and result != "nil":
-                    wait = None
-                    # Restart timeout
-                    start, now = time.time(), time.time()
-                    _json = json.loads(result)
-                    # Watch out, it may not have callId
-                    call_id = _json.get("callId")
-                    if _json["payload"]:
-                        self.handle_incoming_response(call_id, _json["payload"])
-                else:
-                    self.log.debug('unqueue: nil or None received')
-
-        if (now - start) >= timeout:
-            self.log.warning('unqueue: no reply from server for %ss', timeout)
+        Messages are taken by priority from the queue, so that a flood of
+        events can't hold up the results of a command. Those left over are
+        handled on the next call.
+
+        Args:
+            budget (float): Defaults to ``self.unqueue_budget``. At least one
+                message is handled however small it is.
+
+        Returns:
+            bool: Whether messages were left over.
+        """
+        deadline = time.time() + (self.unqueue_budget if budget is None else budget)
+        handled = 0
+
+        if self.queue.dropped_notes > self.dropped_notes:
+            dropped = self.queue.dropped_notes - self.dropped_notes
+            self.log.warning('unqueue: dropped %d typecheck notes, too many to handle', dropped)
+            self.editor.raw_message(feedback["notes_truncated"].format(dropped))
+            self.dropped_notes = self.queue.dropped_notes
+
+        while True:
+            if handled and time.time() >= deadline:
+                self.log.debug('unqueue: %d messages left for next tick', len(self.queue))
+                return not self.queue.empty()
+            message = self.queue.get()
+            if message is None:
+                return False
+            self._dispatch(message)
+            handled += 1
+
+    def _dispatch(self, message):
+        """Invoke the handler for the payload of a decoded message.
+
+        Returns:
+            bool: Whether the message had a payload.
+        """
+        if message.call_id is not None:
+            with self._pending_lock:
+                self.awaiting_reply.pop(message.call_id, None)
+        if message.payload:
+            self.handle_incoming_response(message.call_id, message.payload)
+        return True
+
+    def busy(self):
+        """Whether replies or typecheck notes are expected, or messages are
+        waiting to be handled.
+
+        Requests unanswered for longer than ``request_timeout`` don't count,
+        nor typechecks not completed in that time (completions don't come
+        for Java).
+        """
+        expired = time.time() - self.request_timeout
+        if self.has_backlog():
+            return True
+        if self.currently_buffering_typechecks and self.typecheck_started > expired:
+            return True
+
+        with self._pending_lock:
+            for call_id, sent in list(self.awaiting_reply.items()):
+                if sent < expired:
+                    del self.awaiting_reply[call_id]
+                    self.stats.request_dropped(call_id)
+            return bool(self.awaiting_reply)
+
+    def has_backlog(self):
+        """Whether messages or usages are waiting to be handled or shown."""
+        return not self.queue.empty() or self.usages_pending()
+
+    def usages_pending(self):
+        """Whether usages are waiting to be shown, see :meth:`display_more_usages`."""
+        return bool(self.usage_list and self.usage_list.pending)
 
     def unqueue_and_display(self, filename):
         """Unqueue messages and give feedback to user (if necessary)."""
         if self.running and self.ws:
             self.editor.lazy_display_error(filename)
             self.unqueue()
+            self.display_new_notes()
+            self.display_more_usages()
 
     def tick(self, filename):
         """Try to connect and display messages in queue."""
@@ -648,42 +957,94 @@ class EnsimeClient(TypecheckHandler, DebuggerClient, ProtocolHandler):
         """Handle omni completion."""
         self.log.debug('complete_func: in %s %s', findstart, base)
 
-        def detect_row_column_start():
-            row, col = self.editor.cursor()
-            start = col
-            line = self.editor.getline()
-            while start > 0 and line[start - 1] not in " .,([{":
-                start -= 1
-            # Start should be 1 when startcol is zero
-            return row, col, start if start else 1
-
         if str(findstart) == "1":
-            row, col, startcol = detect_row_column_start()
-
-            # Make request to get response ASAP
-            self.complete(row, col)
-            self.completion_started = True
+            return self._start_completion()
+        else:
+            return self._finish_completion(base or "")
 
-            # We always allow autocompletion, even with empty seeds
-            return startcol
+    def _start_completion(self):
+        """First invocation of the omni function: find the start column and
+        request suggestions from the server, unless they are cached.
+        """
+        row, col = self.editor.cursor()
+        start = col
+        line = self.editor.getline()
+        while start > 0 and line[start - 1] not in " .,([{":
+            start -= 1
+        seed = line[start:col]
+
+        # b:changedtick moves with every character typed, so the receiver
+        # text and line count stand in for the version of the buffer.
+        site = (self.editor.path(), row, start, line[:start], self.editor.line_count())
+        self.completion_site = site
+
+        inflight = self.completion_future
+        if (inflight and self.completion_request[0] == site and
+                seed.startswith(self.completion_request[1])):
+            # Typing faster than the server answers, keep waiting for the
+            # request in flight: its results only need narrowing down.
+            self.log.debug('complete_func: reusing %s', inflight)
         else:
-            result = []
-            # Only handle snd invocation if fst has already been done
-            if self.completion_started:
-                # Unqueing messages until we get suggestions
-                self.unqueue(timeout=self.completion_timeout, should_wait=True)
-                suggestions = self.suggestions or []
-                self.log.debug('complete_func: suggestions in')
-                for m in suggestions:
-                    result.append(m)
-                self.suggestions = None
-                self.completion_started = False
-            return result
+            if inflight:
+                self.cancel_request(inflight)
+                self.completion_future = None
+            if self.completion_cache.get(site, seed) is None:
+                # Make request to get response ASAP
+                self.completion_future = self.complete(row, col)
+                self.completion_request = (site, seed)
+
+        # We always allow autocompletion, even with empty seeds.
+        # Start should be 1 when startcol is zero
+        return start if start else 1
+
+    def _finish_completion(self, base):
+        """Second invocation of the omni function: return the suggestions."""
+        # Only handle snd invocation if fst has already been done
+        if not self.completion_site:
+            return []
+
+        result = None
+        future = self.completion_future
+        if future:
+            # Wait for our own suggestions, other messages can wait
+            message = future.result(self.completion_timeout)
+            if message is None:
+                # Left in flight, a retry at this position will reuse it
+                self.log.warning('complete_func: no reply from server for %ss',
+                                 self.completion_timeout)
+                return []
+
+            self.completion_future = None
+            self._dispatch(message)
+            self.log.debug('complete_func: suggestions in')
+            if self.suggestions is not None:
+                site, seed = self.completion_request
+                self.completion_cache.put(site, seed, self.suggestions,
+                                          not self.suggestions_truncated)
+                if base != seed:
+                    # Reused for a longer seed: narrow the reply down here,
+                    # the cache won't if it's truncated
+                    result = narrow(self.suggestions, base)
+            self.suggestions = None
+
+        if result is None:
+            result = self.completion_cache.get(self.completion_site, base) or []
+        self.completion_site = None
+        return result
 
     def _file_info(self):
-        """Message fragment for ENSIME ``fileInfo`` field, from current file."""
+        """Message fragment for ENSIME ``fileInfo`` field, from current file.
+
+        The buffer contents are only inlined when it has unsaved changes, a
+        saved buffer is read from disk. The server doesn't keep contents sent
+        before, so they are inlined in every request until saved.
+        """
+        path = self.editor.path()
+        if not self.editor.is_modified():
+            return {'file': path}
+
         return {
-            'file': self.editor.path(),
+            'file': path,
             'contents': self.editor.get_file_content(),
         }
 
@@ -0,0 +1,44 @@
+# coding: utf-8
+
+"""
+JSON backends to decode messages from the server with.
+
+The standard library module is always available; faster implementations are
+used instead when they are installed for the Python running the plugin.
+"""
+
+import json
+from collections import namedtuple, OrderedDict
+
+Codec = namedtuple('Codec', 'name loads dumps')
+
+CODECS = OrderedDict()
+"""Available codecs by name, fastest first."""
+
+try:
+    import orjson
+except ImportError:
+    pass
+else:
+    CODECS['orjson'] = Codec('orjson', orjson.loads,
+                             lambda obj: orjson.dumps(obj).decode('utf-8'))
+
+try:
+    import ujson
+except ImportError:
+    pass
+else:
+    CODECS['ujson'] = Codec('ujson', ujson.loads, ujson.dumps)
+
+CODECS['json'] = Codec('json', json.loads, json.dumps)
+
+
+def get_codec(name=None):
+    """Returns the codec named ``name``, or the fastest one installed.
+
+    Raises:
+        KeyError: If there is no such codec, or it is not installed.
+    """
+    if name is None:
+        return next(iter(CODECS.values()))
+    return CODECS[name]
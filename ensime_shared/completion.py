@@ -0,0 +1,71 @@
+# coding: utf-8
+
+from collections import namedtuple, OrderedDict
+
+CacheEntry = namedtuple('CacheEntry', 'seed suggestions exhaustive')
+
+
+def narrow(suggestions, seed):
+    """Suggestions whose word starts with ``seed``, exact matches first and
+    otherwise in the server's order of relevance."""
+    matches = [s for s in suggestions if s['word'].startswith(seed)]
+    matches.sort(key=lambda s: s['word'] != seed)  # Stable
+    return matches
+
+
+class CompletionCache(object):
+    """LRU cache of completion suggestions, narrowed locally as the user types.
+
+    Entries are keyed by whatever identifies a completion site: the caller
+    uses file, start position, receiver text and buffer version. A lookup with
+    a seed (the prefix typed since the start column) that extends the cached
+    one is answered by filtering the cached suggestions, provided the server
+    returned all of its candidates rather than hitting ``maxResults``.
+
+    Args:
+        size (int): Maximum number of completion sites to remember.
+    """
+
+    def __init__(self, size=32):
+        self.size = size
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        self._entries.clear()
+
+    def put(self, key, seed, suggestions, exhaustive):
+        """Remember suggestions from the server for a completion site.
+
+        Args:
+            key: Hashable identity of the completion site.
+            seed (str): The prefix the server completed.
+            suggestions (List[dict]): Suggestions as returned to Vim.
+            exhaustive (bool): Whether these are all the server's candidates.
+        """
+        self._entries.pop(key, None)
+        self._entries[key] = CacheEntry(seed, suggestions, exhaustive)
+        while len(self._entries) > self.size:
+            self._entries.popitem(last=False)
+
+    def get(self, key, seed):
+        """Look up suggestions for a seed at a completion site.
+
+        Returns:
+            Optional[List[dict]]: Matching suggestions, exact matches first
+            and otherwise in the server's order of relevance, or ``None`` if
+            the server needs to be asked.
+        """
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return None
+        self._entries[key] = entry  # Most recently used
+
+        if seed == entry.seed:
+            return list(entry.suggestions)
+        if not (entry.exhaustive and seed.startswith(entry.seed)):
+            return None
+
+        return narrow(entry.suggestions, seed)
@@ -2,14 +2,19 @@
 
 import collections
 import os
+import time
 
 import sexpdata
 
+from ensime_shared import sexp
 from ensime_shared.util import Util
 
 BOOTSTRAPS_ROOT = os.path.join(os.environ['HOME'], '.config', 'ensime-vim')
 """Default directory where ENSIME server bootstrap projects will be created."""
 
+FIND_TTL = 5
+"""Seconds for which the result of a search for an ``.ensime`` is trusted."""
+
 LOG_FORMAT = '%(levelname)-8s <%(asctime)s> (%(filename)s:%(lineno)d) - %(message)s'
 
 gconfig = {
@@ -29,15 +34,18 @@ feedback = {
     "invalid_java": "Java not found or not executable, verify :java-home in your .ensime config",
     "manual_doc": "Go to {}",
     "missing_debug_class": "You must specify a class to debug",
+    "notes_truncated": "Too many typecheck notes, the oldest {} were dropped",
     "notify_break": "Execution paused at breakpoint line {} in {}",
     "package_inspect_current": "Using currently focused package...",
     "prompt_server_install":
         "Please run :EnInstall to install the ENSIME server for Scala {scala_version}",
     "spawned_browser": "Opened tab {}",
     "start_message": "Server has been started...",
+    "stats_written": "Statistics written to {}",
     "symbol_search_symbol_required": "Must provide symbols to search for!",
     "typechecking": "Typechecking...",
     "unknown_symbol": "Symbol not found",
+    "usages_truncated": "Showing {} of {} usages, :EnUsagesMore to show more",
     "false_response": "Unable to process command",
 }
 
@@ -49,9 +57,12 @@ class ProjectConfig(collections.Mapping):
         filepath (str): Path of an ``.ensime`` file to parse.
     """
 
+    _parsed = {}
+    """Parsed configs by canonical path, with the size and mtime they had."""
+
     def __init__(self, filepath):
         self._filepath = os.path.realpath(filepath)
-        self.__data = self.parse(filepath)
+        self.__data = self.cached_parse(self._filepath)
 
     # Provide the Mapping protocol requirements
 
@@ -75,16 +86,40 @@ class ProjectConfig(collections.Mapping):
         """str: The canonical path of the represented config file."""
         return self._filepath
 
-    @staticmethod
-    def find_from(path):
+    _found = {}
+    """Results of searches for an ``.ensime``, by starting path, with their time."""
+
+    _clock = staticmethod(time.time)
+
+    @classmethod
+    def find_from(cls, path):
         """Find path of an .ensime config, searching recursively upward from path.
 
+        Configs found are remembered for ``FIND_TTL`` seconds, as searches are
+        done for each command and event. They are checked to still exist, but
+        one created closer meanwhile is only noticed after that. Searches
+        that found nothing aren't remembered, to notice new projects at once.
+
         Args:
             path (str): Path of a file or directory from where to start searching.
 
         Returns:
             str: Canonical path of nearest ``.ensime``, or ``None`` if not found.
         """
+        now = cls._clock()
+        cached = cls._found.get(path)
+        if cached and now - cached[1] < FIND_TTL and os.path.isfile(cached[0]):
+            return cached[0]
+
+        config_path = cls._search(path)
+        if config_path:
+            cls._found[path] = (config_path, now)
+        else:
+            cls._found.pop(path, None)
+        return config_path
+
+    @staticmethod
+    def _search(path):
         realpath = os.path.realpath(path)
         config_path = os.path.join(realpath, '.ensime')
 
@@ -94,7 +129,31 @@ class ProjectConfig(collections.Mapping):
             return None
         else:
             dirname = os.path.dirname(realpath)
-            return ProjectConfig.find_from(dirname)
+            return ProjectConfig._search(dirname)
+
+    @classmethod
+    def cached_parse(cls, path):
+        """Parse an ``.ensime`` config file, unless it is unchanged since the
+        last time it was parsed by this process.
+
+        Big projects have configs with thousands of classpath entries, which
+        are slow to parse.
+
+        Args:
+            path (str): Canonical path of an ``.ensime`` file to parse.
+
+        Returns:
+            dict: Configuration values with string keys, shared by all callers.
+        """
+        stat = os.stat(path)
+        version = (stat.st_size, getattr(stat, 'st_mtime_ns', stat.st_mtime))
+        cached = cls._parsed.get(path)
+        if cached and cached[0] == version:
+            return cached[1]
+
+        data = cls.parse(path)
+        cls._parsed[path] = (version, data)
+        return data
 
     @staticmethod
     def parse(path):
@@ -106,6 +165,19 @@ class ProjectConfig(collections.Mapping):
         Returns:
             dict: Configuration values with string keys.
         """
+        text = Util.read_file(path)
+        try:
+            return sexp.loads_config(text)
+        except sexp.UnsupportedSyntax:
+            return ProjectConfig.parse_sexpdata(text)
+
+    @staticmethod
+    def parse_sexpdata(text):
+        """Parse an ``.ensime`` config with the generic ``sexpdata`` parser.
+
+        Slower than :meth:`parse` but supports any S-expression, and raises
+        ``sexpdata`` errors on invalid ones.
+        """
 
         def paired(iterable):
             """s -> (s0, s1), (s2, s3), (s4, s5), ..."""
@@ -138,5 +210,5 @@ class ProjectConfig(collections.Mapping):
 
             return newdict
 
-        conf = sexpdata.loads(Util.read_file(path))
+        conf = sexpdata.loads(text)
         return sexp2dict(conf)
@@ -1,22 +1,99 @@
 # coding: utf-8
+import json
+from contextlib import contextmanager
 from os import path
 
 from .config import feedback
-from .errors import Error
+from .errors import Error, ErrorIndex
+from .offsets import LineOffsets
+from .util import chunks, identifier_bounds
+
+MATCH_BATCH_SIZE = 500
+"""Maximum number of highlight matches added or deleted per editor call."""
+
+QUICKFIX_CHUNK_SIZE = 5000
+"""Maximum number of quickfix items passed per editor call."""
 
 
 class Editor(object):
 
     def __init__(self, driver):
-        self._vim = driver
+        self._driver = driver
+        self._batch = None  # Commands deferred by batch()
+        self._has_execute = None
         self._isneovim = bool(int(self._vim.eval("has('nvim')")))
 
         # Old API
-        self._errors = []   # Line error structs reported from ENSIME notes
+        self._errors = ErrorIndex()   # Line error structs reported from ENSIME notes
+        # (path, cursor) where lazy_display_error last looked for an error
+        self._error_spot = None
+
+        # Vim highlight match IDs for errors, by (line, start col, end col)
+        self._matches = {}
+
+        # Line offset indexes by buffer number, see line_offsets()
+        self._offsets = {}
+
+    @property
+    def _vim(self):
+        """The driver, once the commands deferred by :meth:`batch` have run,
+        since whatever is done with it may depend on them."""
+        if self._batch:
+            self._flush()
+        return self._driver
+
+    @contextmanager
+    def batch(self):
+        """Defer the commands run by editor methods to the end of the block,
+        to run them all in one call.
+
+        On Neovim that is an atomic ``nvim_call_atomic`` request, on Vim an
+        ``execute()``. Anything else done meanwhile, like getting a value, runs
+        the commands deferred so far first. Nested batches join the outermost.
+        """
+        if self._batch is not None:
+            yield
+            return
 
-        # Vim highlight matches for errors, for clearing
-        # TODO: this seems unneeded, clearmatches()
-        self._matches = []
+        self._batch = []
+        try:
+            yield
+        finally:
+            try:
+                self._flush()
+            finally:
+                self._batch = None
+
+    def _command(self, command):
+        """Run an Ex command, or defer it in a :meth:`batch`."""
+        if self._batch is None:
+            self._driver.command(command)
+        else:
+            self._batch.append(command)
+
+    def _flush(self):
+        commands, self._batch = self._batch, []
+        driver = self._driver
+        if not commands:
+            return
+        if len(commands) == 1:
+            driver.command(commands[0])
+        elif self.isneovim:
+            _, error = driver.api.call_atomic([['nvim_command', [c]] for c in commands])
+            if error:
+                index, _, message = error
+                raise driver.error('{}: {}'.format(commands[index], message))
+        elif self._vim_has_execute():
+            quoted = ("'{}'".format(c.replace("'", "''")) for c in commands)
+            driver.eval('execute([{}])'.format(', '.join(quoted)))
+        else:
+            for command in commands:
+                driver.command(command)
+
+    def _vim_has_execute(self):
+        if self._has_execute is None:
+            self._has_execute = bool(int(self._driver.eval("exists('*execute')")))
+        return self._has_execute
 
     def append(self, text, afterline=None):
         """Append text to the current buffer.
@@ -32,11 +109,30 @@ class Editor(object):
         else:
             self._vim.current.buffer.append(text)
 
+    def replace_lines(self, first, last, lines):
+        """Replace lines of the current buffer, in a single call.
+
+        Args:
+            first (int): Number of the first line to replace, 1-based.
+            last (int): Number of the last line to replace, included.
+            lines (Sequence[str]): Lines to put in their place, which may be
+                more or fewer.
+        """
+        self._vim.current.buffer[first - 1:last] = lines
+
     @property
     def isneovim(self):
         """bool: Whether the underlying editor is Neovim. Use this sparingly."""
         return self._isneovim
 
+    def changedtick(self):
+        """Get Vim's ``b:changedtick`` for the current buffer.
+
+        Returns:
+            int: A counter that increases on every change to the buffer.
+        """
+        return int(self._vim.eval('b:changedtick'))
+
     # TODO: make this read-only property-like?
     def current_word(self):
         """Get the current word under the cursor."""
@@ -49,11 +145,11 @@ class Editor(object):
             *autocmds (str): Names of autocommands to trigger.
                 See ``:h autocmd-events``.
         """
-        self._vim.command('doautocmd ' + ','.join(autocmds))
+        self._command('doautocmd ' + ','.join(autocmds))
 
     def edit(self, fpath):
         """Edit a file with path ``fpath``, in the current window."""
-        self._vim.command('edit ' + fpath)
+        self._command('edit ' + fpath)
 
     def getline(self, lnum=None):
         """Get a line from the current buffer.
@@ -79,6 +175,10 @@ class Editor(object):
         buf = self._vim.buffers[bufnr] if bufnr else self._vim.current.buffer
         return buf[:]
 
+    def line_count(self):
+        """Get the number of lines in the current buffer."""
+        return len(self._vim.current.buffer)
+
     def goto(self, offset):
         """Go to a specific byte offset in the current buffer.
 
@@ -86,11 +186,35 @@ class Editor(object):
         """
         self._vim.command('goto {}'.format(offset))
 
+    def line_offsets(self):
+        """Get the line offsets index of the current buffer.
+
+        Indexes are kept per buffer and only refreshed when the buffer's
+        ``b:changedtick`` has moved since, saving a copy of the whole buffer.
+        The ticks indexed are passed to Vim so that the buffer number, its
+        tick and, only if stale, its lines come back in a single call.
+
+        Returns:
+            LineOffsets
+        """
+        indexed = ', '.join("'{}': {}".format(bufnr, offsets.changedtick)
+                            for bufnr, offsets in self._offsets.items())
+        result = self._vim.eval(
+            "[bufnr('%'), b:changedtick] + "
+            "(get({{{}}}, bufnr('%'), -1) == b:changedtick ? [] : [getline(1, '$')])"
+            .format(indexed))
+        bufnr, changedtick = int(result[0]), int(result[1])
+
+        offsets = self._offsets.get(bufnr)
+        if offsets is None:
+            offsets = self._offsets[bufnr] = LineOffsets()
+        if len(result) > 2:
+            offsets.update(result[2], changedtick)
+        return offsets
+
     def point2pos(self, point):
         """Converts a point or offset in a file to a (row, col) position."""
-        row = self._vim.eval('byte2line({})'.format(point))
-        col = self._vim.eval('{} - line2byte({})'.format(point, row))
-        return (int(row), int(col))
+        return self.line_offsets().position(point - 1)
 
     def menu(self, prompt, choices):
         """Presents a selection menu and returns the user's choice.
@@ -179,7 +303,7 @@ class Editor(object):
         if size:
             command = str(size) + command
 
-        self._vim.command(command)
+        self._command(command)
 
         if bufopts:
             self.set_buffer_options(bufopts)
@@ -218,6 +342,8 @@ class Editor(object):
         # TODO: custom filetype ftplugin
         self._vim.command(
             'autocmd FileType package_info nnoremap <buffer> <Space> :call EnPackageDecl()<CR>')
+        self._vim.command(
+            'autocmd FileType package_info nnoremap <buffer> o :call EnPackageToggle()<CR>')
         self._vim.command('autocmd FileType package_info setlocal splitright')
 
     # TODO: make this a R/W property?
@@ -232,16 +358,32 @@ class Editor(object):
 
         Operation is not added to the jump list.
         """
-        self._vim.current.window.cursor = (row, col)
+        if self._batch is None:
+            self._vim.current.window.cursor = (row, col)
+        else:
+            self._command('call cursor({}, {})'.format(row, col + 1))
 
-    # TODO: don't displace user's cursor; can something like ``getpos()`` do this?
     def word_under_cursor_pos(self):
-        """Return start and end positions of the cursor respectively."""
-        self._vim.command('normal e')
-        end = self.cursor()
-        self._vim.command('normal b')
-        beg = self.cursor()
-        return beg, end
+        """Return start and end positions of the identifier under the cursor.
+
+        They are found in the text of the current line, the cursor doesn't move.
+        See :func:`ensime_shared.util.identifier_bounds`. Columns are byte
+        indexes like the cursor's.
+        """
+        row, col = self.cursor()
+        line = self.getline()
+        if isinstance(line, bytes):
+            beg, end = identifier_bounds(line, col)
+            return (row, beg), (row, end)
+
+        # Lines are decoded, find the character at the cursor's byte
+        encoded = line.encode('utf-8')
+        char = len(encoded[:col].decode('utf-8', 'ignore'))
+        beg, end = identifier_bounds(line, char)
+
+        def byte(index):
+            return len(line[:index].encode('utf-8'))
+        return (row, byte(beg)), (row, byte(end))
 
     def selection_pos(self):
         """Return start and end positions of the visual selection respectively."""
@@ -258,6 +400,10 @@ class Editor(object):
         """Get content of file."""
         return "\n".join(self._vim.current.buffer)
 
+    def is_modified(self):
+        """Return True if the current buffer has unsaved changes."""
+        return bool(int(self._vim.eval('&modified')))
+
     # This is used only once, maybe just make a higher-level API or inline it
     def width(self):
         """Return the width of the window."""
@@ -279,17 +425,61 @@ class Editor(object):
                 "type": tpe}
 
     def write_quickfix_list(self, qflist, title):
-        if self._isneovim:
-            self._vim.command("call setqflist({!s}, 'r', 'Ensime - {}')".format(qflist, title))
-            self._vim.command('copen')
+        """Replace the quickfix list, and open its window.
+
+        Items are passed to ``setqflist()`` as data, in chunks of at most
+        ``QUICKFIX_CHUNK_SIZE``. The window is opened and drawn once the
+        first chunk is in, then the others are appended.
+
+        Args:
+            qflist (List[dict]): Items as made by :meth:`to_quickfix_item`.
+            title (str): Title of the list, after ``Ensime -``.
+        """
+        title = 'Ensime - {}'.format(title)
+        parts = list(chunks(qflist, QUICKFIX_CHUNK_SIZE)) or [[]]
+
+        self._setqflist(parts[0], 'r', title)
+        self._vim.command('copen')
+        if not self.isneovim:
+            self._vim.command("let w:quickfix_title='{}'".format(title.replace("'", "''")))
+        if len(parts) > 1:
+            self._vim.command('redraw')
+
+        for items in parts[1:]:
+            self._setqflist(items, 'a', title)
+
+    def append_quickfix_list(self, qflist, title):
+        """Append items to the quickfix list written by :meth:`write_quickfix_list`.
+
+        Args:
+            qflist (List[dict]): Items as made by :meth:`to_quickfix_item`.
+            title (str): Title of the list, after ``Ensime -``.
+        """
+        title = 'Ensime - {}'.format(title)
+        for items in chunks(qflist, QUICKFIX_CHUNK_SIZE):
+            self._setqflist(items, 'a', title)
+
+    def _setqflist(self, items, action, title):
+        if self.isneovim:
+            self._vim.call('setqflist', items, action, title)
+        elif hasattr(self._vim, 'Function'):
+            self._vim.Function('setqflist')(items, action)
         else:
-            self._vim.command("call setqflist({!s}, 'r')".format(qflist))
-            self._vim.command('copen')
-            self._vim.command("let w:quickfix_title='Ensime - {}'".format(title))
+            # Vim without vim.Function, JSON is a valid expression for these items
+            self._vim.command("call setqflist({}, '{}')".format(json.dumps(items), action))
 
     def lazy_display_error(self, filename):
-        """Display error when user is over it."""
+        """Display error when user is over it.
+
+        Nothing is done unless the cursor moved, or errors changed, since the
+        last call.
+        """
         position = self.cursor()
+        spot = (filename, tuple(position))
+        if spot == self._error_spot:
+            return
+        self._error_spot = spot
+
         error = self.get_error_at(position)
         if error:
             report = error.get_truncated_message(position, self.width() - 1)
@@ -297,18 +487,18 @@ class Editor(object):
 
     def get_error_at(self, cursor):
         """Return error at position `cursor`."""
-        for error in self._errors:
-            if error.includes(self._vim.eval("expand('%:p')"), cursor):
-                return error
-        return None
+        if not self._errors:
+            return None
+        return self._errors.at(path.abspath(self.path()), cursor)
 
     def clean_errors(self):
         """Clean errors and unhighlight them in vim."""
-        self._vim.eval('clearmatches()')
-        self._errors = []
-        self._matches = []
+        self._command('call clearmatches()')
+        self._errors = ErrorIndex()
+        self._error_spot = None
+        self._matches = {}
         # Reset Syntastic notes - TODO: bufdo?
-        self._vim.current.buffer.vars['ensime_notes'] = []
+        self._command('let b:ensime_notes = []')
 
     def message(self, key):
         """Display a message already defined in `feedback`."""
@@ -327,32 +517,12 @@ class Editor(object):
         else:
             vim.command(cmd)
 
-    def symbol_for_inspector_line(self, lineno):
-        """Given a line number for the Package Inspector window, returns the
-        fully-qualified name for the symbol on that line.
-        """
-        def indent(line):
-            n = 0
-            for char in line:
-                if char == ' ':
-                    n += 1
-                else:
-                    break
-            return n / 2
-
-        lines = self._vim.current.buffer[:lineno]
-        i = indent(lines[-1])
-        fqn = [lines[-1].split()[-1]]
-
-        for line in reversed(lines):
-            if indent(line) == i - 1:
-                i -= 1
-                fqn.insert(0, line.split()[-1])
-
-        return ".".join(fqn)
-
     def display_notes(self, notes):
-        """Renders "notes" reported by ENSIME, such as typecheck errors."""
+        """Renders "notes" reported by ENSIME, such as typecheck errors.
+
+        ``notes`` replaces whatever was displayed before, only highlights of
+        notes that were added or went away are touched.
+        """
 
         # TODO: this can probably be a cached property like isneovim
         hassyntastic = bool(int(self._vim.eval('exists(":SyntasticCheck")')))
@@ -362,8 +532,6 @@ class Editor(object):
         else:
             self.__display_notes(notes)
 
-        self._vim.command('redraw!')
-
     def __display_notes_with_syntastic(self, notes):
 
         def is_note_correct(note):  # Server bug? See #200
@@ -383,27 +551,47 @@ class Editor(object):
             and is_note_correct(note)
         )
 
-        if loclist:
-            bufvars = self._vim.current.buffer.vars
-            if not bufvars.get('ensime_notes'):
-                bufvars['ensime_notes'] = []
-
-            bufvars['ensime_notes'] += loclist
+        bufvars = self._vim.current.buffer.vars
+        if loclist or bufvars.get('ensime_notes'):
+            bufvars['ensime_notes'] = loclist
             self._vim.command('silent! SyntasticCheck ensime')
 
     def __display_notes(self, notes):
         current_file = self.path()
-        highlight_cmd = r"matchadd('EnErrorStyle', '\%{}l\%>{}c\%<{}c')"
+        abspaths = {}
+        errors = ErrorIndex()
+        spans = set()
 
         for note in notes:
             l = note['line']
             c = note['col'] - 1
             e = note['col'] + (note['end'] - note['beg'] + 1)
 
-            if current_file == path.abspath(note['file']):
-                error = Error(note['file'], note['msg'], l, c, e)
-                match = self._vim.eval(highlight_cmd.format(l, c, e))
-                self._errors.append(error)
-                self._matches.append(match)
-                # add_match_msg = "added match {} at line {} column {} error {}"
-                # self.log.debug(add_match_msg.format(match, l, c, e))
+            f = note['file']
+            if f not in abspaths:
+                abspaths[f] = path.abspath(f)
+            if current_file == abspaths[f]:
+                errors.add(Error(f, note['msg'], l, c, e))
+                spans.add((l, c, e))
+
+        self._errors = errors
+        self._error_spot = None
+
+        stale = [span for span in self._matches if span not in spans]
+        self.__delete_matches([self._matches.pop(span) for span in stale])
+        self.__add_matches(sorted(span for span in spans if span not in self._matches))
+
+    def __add_matches(self, spans):
+        """Highlight error spans, batching many ``matchadd()`` per call."""
+        highlight_cmd = r"matchadd('EnErrorStyle', '\%{}l\%>{}c\%<{}c')"
+
+        for batch in chunks(spans, MATCH_BATCH_SIZE):
+            exprs = [highlight_cmd.format(*span) for span in batch]
+            matches = self._vim.eval('[{}]'.format(', '.join(exprs)))
+            self._matches.update(zip(batch, matches))
+
+    def __delete_matches(self, matches):
+        """Remove highlights by match ID, batching many per call."""
+        for batch in chunks(matches, MATCH_BATCH_SIZE):
+            self._vim.command(' | '.join(
+                'silent! call matchdelete({})'.format(m) for m in batch))
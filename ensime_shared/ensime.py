@@ -3,7 +3,7 @@
 import os
 
 from .client import EnsimeClientV1, EnsimeClientV2
-from .config import ProjectConfig
+from .config import FIND_TTL, ProjectConfig
 from .editor import Editor
 from .launcher import EnsimeLauncher
 from .ticker import Ticker
@@ -51,6 +51,8 @@ class Ensime(object):
         self._vim = vim
         self._ticker = None
         self.clients = {}
+        # Buffer number: (buffer name, config path, client, time found)
+        self._buffer_clients = {}
 
     @property
     def using_server_v2(self):
@@ -84,15 +86,31 @@ class Ensime(object):
             c.teardown()
 
     def current_client(self, quiet, bootstrap_server, create_client):
-        """Return the client for current file in the editor."""
-        current_file = self._vim.current.buffer.name
+        """Return the client for current file in the editor.
+
+        The client of a buffer is remembered while the buffer keeps its name
+        and the project's ``.ensime`` is still there, for ``FIND_TTL`` seconds
+        like the config found by :meth:`ProjectConfig.find_from`.
+        """
+        buffer = self._vim.current.buffer
+        current_file = buffer.name
+        now = ProjectConfig._clock()
+        cached = self._buffer_clients.get(buffer.number)
+        if (cached and cached[0] == current_file and now - cached[3] < FIND_TTL and
+                os.path.isfile(cached[1])):
+            return cached[2]
+
         config_path = ProjectConfig.find_from(current_file)
         if config_path:
-            return self.client_for(
+            client = self.client_for(
                 config_path,
                 quiet=quiet,
                 bootstrap_server=bootstrap_server,
                 create_client=create_client)
+            if client and os.path.abspath(config_path) in self.clients:
+                self._buffer_clients[buffer.number] = (current_file, config_path, client, now)
+            return client
+        self._buffer_clients.pop(buffer.number, None)
 
     def client_for(self, config_path, quiet=False, bootstrap_server=False,
                    create_client=False):
@@ -105,6 +123,8 @@ class Ensime(object):
             client = self.create_client(config_path)
             if client.setup(quiet=quiet, bootstrap_server=bootstrap_server):
                 self.clients[abs_path] = client
+                self._create_ticker()
+                self._ticker.watch(client)
         return client
 
     def create_client(self, config_path):
@@ -121,14 +141,12 @@ class Ensime(object):
         else:
             client = EnsimeClientV1(editor, launcher)
 
-        self._create_ticker()
-
         return client
 
     def _create_ticker(self):
         """Create and start the periodic ticker."""
         if not self._ticker:
-            self._ticker = Ticker(self._vim)
+            self._ticker = Ticker(self._vim, self.tick_clients)
 
     def disable_plugin(self):
         """Disable ensime-vim, in the event of an error we can't usefully
@@ -163,8 +181,9 @@ class Ensime(object):
         if not self._ticker:
             self._create_ticker()
 
-        for client in self.clients.values():
-            self._ticker.tick(client)
+        ticked = [client for client in list(self.clients.values())
+                  if self._ticker.tick(client)]
+        self._ticker.ticked(ticked)
 
     @execute_with_client()
     def com_en_toggle_teardown(self, client, args, range=None):
@@ -182,6 +201,10 @@ class Ensime(object):
     def com_en_usages(self, client, args, range=None):
         client.usages()
 
+    @execute_with_client()
+    def com_en_usages_more(self, client, args, range=None):
+        client.more_usages()
+
     @execute_with_client()
     def com_en_toggle_fulltype(self, client, args, range=None):
         client.toggle_fulltype(None)
@@ -202,6 +225,10 @@ class Ensime(object):
     def fun_en_package_decl(self, client, args, range=None):
         client.open_decl_for_inspector_symbol()
 
+    @execute_with_client()
+    def fun_en_package_toggle(self, client, args, range=None):
+        client.toggle_inspector_node()
+
     @execute_with_client()
     def com_en_symbol(self, client, args, range=None):
         client.symbol(args, range)
@@ -280,6 +307,10 @@ class Ensime(object):
             status = self.client_status(path)
             client.editor.raw_message("{}: {}".format(path, status))
 
+    @execute_with_client()
+    def com_en_stats(self, client, args, range=None):
+        client.show_stats(args, range)
+
     @execute_with_client()
     def com_en_sym_search(self, client, args, range=None):
         client.symbol_search(args)
@@ -27,8 +27,11 @@ class Error(object):
     def includes(self, path, cursor):
         return self.path == os.path.abspath(path) \
             and cursor[0] == self.l \
-            and self.c <= cursor[1] \
-            and cursor[1] < self.e
+            and self.covers(cursor[1])
+
+    def covers(self, column):
+        """Whether the error spans a column of its line."""
+        return self.c <= column < self.e
 
     def get_truncated_message(self, cursor, width):
         size = len(self.message)
@@ -45,3 +48,42 @@ class Error(object):
             end = size
             start = size - width
         return self.message[start:end]
+
+
+class ErrorIndex(object):
+    """Errors reported by ENSIME, indexed by file and line.
+
+    Finding the error under the cursor only looks at the errors on its line,
+    rather than at every error reported for the project.
+    """
+
+    def __init__(self):
+        self._lines = {}  # path -> line number -> [Error]
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def __iter__(self):
+        for lines in self._lines.values():
+            for errors in lines.values():
+                for error in errors:
+                    yield error
+
+    def add(self, error):
+        lines = self._lines.setdefault(error.path, {})
+        lines.setdefault(error.l, []).append(error)
+        self._count += 1
+
+    def at(self, path, cursor):
+        """Return the first error added that spans ``cursor`` in file ``path``.
+
+        Args:
+            path (str): Absolute path of the file.
+            cursor (Tuple[int, int]): ``(row, col)`` position in the file.
+        """
+        errors = self._lines.get(path, {}).get(cursor[0], ())
+        for error in errors:
+            if error.covers(cursor[1]):
+                return error
+        return None
@@ -0,0 +1,114 @@
+# coding: utf-8
+
+
+class PackageNode(object):
+    """A member of a package, on a line of the package inspector.
+
+    Nodes for members of a member are only made when it is first expanded.
+
+    Attributes:
+        name (str): Name of the member.
+        fqn (str): Fully-qualified name of the member.
+        kind (str): ``Class``, ``Object``, ``Trait``... for types, else empty.
+        depth (int): Depth in the tree, ``0`` for the package itself.
+        expanded (bool): Whether the members of this one are shown.
+    """
+
+    __slots__ = ('name', 'fqn', 'kind', 'depth', 'expanded', '_members', '_children')
+
+    def __init__(self, info, fqn, depth):
+        self.name = info["name"]
+        self.fqn = fqn
+        self.kind = info["declAs"]["typehint"] if info["typehint"] == "BasicTypeInfo" else ""
+        self.depth = depth
+        self.expanded = False
+        self._members = info.get("members") or []
+        self._children = None
+
+    @property
+    def expandable(self):
+        return bool(self._members)
+
+    @property
+    def children(self):
+        """List[PackageNode]: Nodes of the members, made on first access."""
+        if self._children is None:
+            self._children = [PackageNode(m, '{}.{}'.format(self.fqn, m["name"]), self.depth + 1)
+                              for m in self._members]
+        return self._children
+
+    def line(self):
+        """Text of the node's line in the package inspector."""
+        if self.depth == 0:
+            return self.fqn
+        marker = ('-' if self.expanded else '+') if self.expandable else ' '
+        return '{}{} {}: {}'.format('  ' * (self.depth - 1), marker, self.kind, self.name)
+
+
+class PackageTree(object):
+    """Tree of the members of a package shown in the package inspector.
+
+    Only the members of the package are shown at first. Expanding one adds
+    lines for its members, collapsing it removes them. The nodes shown are
+    kept by line, so finding the one on a line takes ``O(1)``.
+
+    Args:
+        package_info (dict): A ``PackageInfo`` from the server.
+    """
+
+    def __init__(self, package_info):
+        self.root = PackageNode(package_info, package_info["fullName"], 0)
+        self.root.expanded = True
+        self._nodes = [self.root] + self.root.children
+
+    def __len__(self):
+        return len(self._nodes)
+
+    def lines(self):
+        """Text of all the lines of the package inspector.
+
+        Returns:
+            List[str]
+        """
+        return [node.line() for node in self._nodes]
+
+    def node_at(self, lineno):
+        """The node on a line, given its 1-based number, or ``None``."""
+        if 1 <= lineno <= len(self._nodes):
+            return self._nodes[lineno - 1]
+        return None
+
+    def toggle(self, lineno):
+        """Expand or collapse the node on a line.
+
+        Members expanded before are shown again when expanding a node.
+
+        Returns:
+            Optional[Tuple[int, int, List[str]]]: The first and last numbers
+            of the lines to replace, and the lines to replace them with.
+            ``None`` if the node on the line can't be toggled.
+        """
+        node = self.node_at(lineno)
+        if not node or node is self.root or not node.expandable:
+            return None
+
+        index = lineno - 1
+        if node.expanded:
+            end = index + 1
+            while end < len(self._nodes) and self._nodes[end].depth > node.depth:
+                end += 1
+            del self._nodes[index + 1:end]
+            node.expanded = False
+            return lineno, end, [node.line()]
+
+        node.expanded = True
+        shown = list(self._shown(node))
+        self._nodes[index + 1:index + 1] = shown
+        return lineno, lineno, [node.line()] + [n.line() for n in shown]
+
+    def _shown(self, node):
+        for child in node.children:
+            yield child
+            if child.expanded:
+                for descendant in self._shown(child):
+                    yield descendant
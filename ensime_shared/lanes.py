@@ -0,0 +1,131 @@
+# coding: utf-8
+
+from collections import deque
+from threading import Lock
+
+from .responses import Message
+
+HIGH, NORMAL, LOW = range(3)
+
+NOTES_EVENTS = frozenset(['NewScalaNotesEvent', 'NewJavaNotesEvent'])
+
+LOW_PRIORITY_EVENTS = NOTES_EVENTS | frozenset([
+    'ClearAllScalaNotesEvent',
+    'ClearAllJavaNotesEvent',
+    'FullTypeCheckCompleteEvent',
+    'IndexerReadyEvent',
+])
+"""Background events, handled after anything else is. Kept in order."""
+
+MAX_LOW_PRIORITY_NOTES = 10000
+"""Notes kept waiting in the low priority lane at most, the oldest are dropped."""
+
+
+class LaneQueue(object):
+    """Queue of messages from the server, handed out by priority.
+
+    There is a lane for each priority, first in first out:
+
+    - ``HIGH``: replies to requests, which are what the user is waiting for.
+    - ``NORMAL``: other events, like debugger ones.
+    - ``LOW``: typecheck notes and indexer events, the bulk of the traffic.
+
+    The low priority lane coalesces consecutive notes events, so that a flood
+    of them is handled in a few bigger batches: notes are appended to those of
+    the previous event, or replace them if the event has the full set
+    (``isFull``). Repeated events like ``IndexerReadyEvent`` are dropped. The
+    lane keeps at most ``max_notes`` notes, dropping the oldest, which are
+    counted in ``dropped_notes``.
+
+    Messages are put from the receiver thread and taken from the main one.
+    """
+
+    def __init__(self, max_notes=MAX_LOW_PRIORITY_NOTES):
+        self.max_notes = max_notes
+        self.dropped_notes = 0
+        self._lanes = (deque(), deque(), deque())
+        self._notes = 0  # In the low priority lane
+        self._merged = None  # Notes event built by coalescing, which we own
+        self._lock = Lock()
+
+    def __len__(self):
+        return sum(len(lane) for lane in self._lanes)
+
+    def empty(self):
+        return not any(self._lanes)
+
+    @staticmethod
+    def priority(message):
+        if message.call_id is not None:
+            return HIGH
+        if message.typehint in LOW_PRIORITY_EVENTS:
+            return LOW
+        return NORMAL
+
+    def put(self, message):
+        priority = self.priority(message)
+        with self._lock:
+            if priority == LOW:
+                self._put_low(message)
+            else:
+                self._lanes[priority].append(message)
+
+    def get(self):
+        """Take the next message by priority.
+
+        Returns:
+            Optional[Message]: ``None`` if there are none.
+        """
+        with self._lock:
+            for priority, lane in enumerate(self._lanes):
+                if lane:
+                    message = lane.popleft()
+                    if priority == LOW and message.typehint in NOTES_EVENTS:
+                        self._notes -= len(message.payload['notes'])
+                        if message is self._merged:
+                            self._merged = None
+                    return message
+        return None
+
+    def _put_low(self, message):
+        lane = self._lanes[LOW]
+        last = lane[-1] if lane else None
+
+        if message.typehint in NOTES_EVENTS:
+            notes = message.payload['notes']
+            if last and last.typehint == message.typehint:
+                if last is not self._merged:
+                    payload = dict(last.payload, notes=list(last.payload['notes']))
+                    lane[-1] = self._merged = Message(None, last.typehint, payload)
+                merged = self._merged.payload
+                if message.payload.get('isFull'):
+                    self._notes -= len(merged['notes'])
+                    merged['notes'] = list(notes)
+                    merged['isFull'] = True
+                else:
+                    merged['notes'].extend(notes)
+            else:
+                lane.append(message)
+            self._notes += len(notes)
+            if self._notes > self.max_notes:
+                self._drop_oldest_notes(self._notes - self.max_notes)
+        elif last and last.typehint == message.typehint and last.payload == message.payload:
+            # Nothing new
+            return
+        else:
+            lane.append(message)
+
+    def _drop_oldest_notes(self, count):
+        self.dropped_notes += count
+        self._notes -= count
+
+        lane = self._lanes[LOW]
+        for i, message in enumerate(lane):
+            if message.typehint not in NOTES_EVENTS:
+                continue
+            notes = message.payload['notes']
+            kept = notes[count:]
+            count -= len(notes) - len(kept)
+            lane[i] = Message(None, message.typehint, dict(message.payload, notes=kept))
+            if not count:
+                return
@@ -17,14 +17,39 @@ from ensime_shared.errors import InvalidJavaPathError, LaunchError
 from ensime_shared.util import catch, Util
 
 
+PROBE_BACKOFF = 0.1
+"""Initial seconds between probes of a starting server, doubled each time."""
+
+MAX_PROBE_BACKOFF = 2.0
+
+
 class EnsimeProcess(object):
+    """An ENSIME server process, and how ready it is to serve.
+
+    Its ``state`` starts as ``STARTING``, becomes ``READY`` once its HTTP
+    port accepts connections and ``CONNECTED`` when a client marks itself
+    connected, until the server is ``STOPPED``. Readiness is only probed while
+    starting, with an exponential backoff between probes. The port is cached,
+    and the port file only read again when its modification time changes.
+    """
+
+    STARTING = 'starting'
+    READY = 'ready'
+    CONNECTED = 'connected'
+    STOPPED = 'stopped'
 
-    def __init__(self, cache_dir, process, log_path, cleanup):
+    def __init__(self, cache_dir, process, log_path, cleanup, clock=time.time):
         self.log_path = log_path
         self.cache_dir = cache_dir
         self.process = process
+        self.state = self.STARTING
         self.__stopped_manually = False
         self.__cleanup = cleanup
+        self.__clock = clock
+        self.__port = None
+        self.__port_mtime = None
+        self.__next_probe = 0
+        self.__backoff = PROBE_BACKOFF
 
     def stop(self):
         if self.process is None:
@@ -32,6 +57,7 @@ class EnsimeProcess(object):
         os.kill(self.process.pid, signal.SIGTERM)
         self.__cleanup()
         self.__stopped_manually = True
+        self.state = self.STOPPED
 
     def aborted(self):
         return not (self.__stopped_manually or self.is_running())
@@ -42,18 +68,40 @@ class EnsimeProcess(object):
 
     def is_ready(self):
         if not self.is_running():
+            self.state = self.STOPPED
             return False
-        try:
-            port = self.http_port()
-            s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            s.connect(("127.0.0.1", port))
-            s.close()
-            return True
-        except:
-            return False
+        if self.state == self.STARTING:
+            self.__probe()
+        return self.state in (self.READY, self.CONNECTED)
+
+    def mark_connected(self, connected=True):
+        """Record that a client (dis)connected, no need to probe meanwhile."""
+        if self.state != self.STOPPED:
+            self.state = self.CONNECTED if connected else self.READY
 
     def http_port(self):
-        return int(Util.read_file(os.path.join(self.cache_dir, "http")))
+        if self.state == self.CONNECTED and self.__port is not None:
+            return self.__port
+
+        path = os.path.join(self.cache_dir, "http")
+        mtime = os.stat(path).st_mtime
+        if mtime != self.__port_mtime:
+            self.__port = int(Util.read_file(path))
+            self.__port_mtime = mtime
+        return self.__port
+
+    def __probe(self):
+        now = self.__clock()
+        if now < self.__next_probe:
+            return
+
+        try:
+            s = socket.create_connection(("127.0.0.1", self.http_port()))
+            s.close()
+            self.state = self.READY
+        except (EnvironmentError, ValueError):
+            self.__next_probe = now + self.__backoff
+            self.__backoff = min(self.__backoff * 2, MAX_PROBE_BACKOFF)
 
 
 class EnsimeLauncher(object):
@@ -81,7 +129,7 @@ class EnsimeLauncher(object):
     # before this could happen, though.
     def launch(self):
         # This is legacy -- what is it really accomplishing?
-        cache_dir = self.config['cache-dir'],
+        cache_dir = self.config['cache-dir']
         process = EnsimeProcess(cache_dir, None, None, lambda: None)
         if process.is_ready():
             return process
@@ -0,0 +1,65 @@
+# coding: utf-8
+
+from bisect import bisect_right
+
+
+class LineOffsets(object):
+    """Index of the character offset where each line of a buffer starts.
+
+    Holds prefix sums of the line lengths (counting a newline per line), so
+    conversions between ``(row, col)`` positions and offsets in the buffer
+    contents take ``O(1)`` and ``O(log n)`` respectively, with no calls to the
+    editor.
+
+    Rows are 1-based and columns 0-based, as for Vim's window cursor.
+
+    Args:
+        lines (Sequence[str]): Lines of the buffer.
+        changedtick (Optional[int]): The buffer's ``b:changedtick`` for these
+            lines, used by callers to know when the index is stale.
+    """
+
+    def __init__(self, lines=(), changedtick=None):
+        self.changedtick = None
+        self._lengths = []
+        self._starts = [0]
+        self.update(lines, changedtick)
+
+    def __len__(self):
+        return len(self._lengths)
+
+    def update(self, lines, changedtick):
+        """Refresh the index for new contents of the buffer.
+
+        Sums are only recomputed from the first line whose length changed.
+        """
+        lengths = [len(line) for line in lines]
+        old = self._lengths
+
+        first = 0
+        for first, (was, now) in enumerate(zip(old, lengths)):
+            if was != now:
+                break
+        else:
+            first = min(len(old), len(lengths))
+
+        starts = self._starts[:first + 1]
+        total = starts[-1]
+        for length in lengths[first:]:
+            total += length + 1
+            starts.append(total)
+
+        self._lengths = lengths
+        self._starts = starts
+        self.changedtick = changedtick
+
+    def offset(self, row, col):
+        """Offset in the buffer contents of position ``(row, col)``."""
+        row = min(max(row, 1), len(self._lengths) + 1)
+        return self._starts[row - 1] + col
+
+    def position(self, offset):
+        """Position ``(row, col)`` of an offset in the buffer contents."""
+        row = bisect_right(self._starts, offset)
+        row = min(max(row, 1), max(len(self._lengths), 1))
+        return (row, offset - self._starts[row - 1])
@@ -1,10 +1,12 @@
 # coding: utf-8
 
+import time
 import webbrowser
-from operator import itemgetter
 
 from .config import feedback, gconfig
+from .inspector import PackageTree
 from .symbol_format import completion_to_suggest
+from .usages import USAGES_PAGE, Usages
 from .util import catch, Pretty
 
 
@@ -58,11 +60,13 @@ class ProtocolHandler(object):
             msg = feedback["handler_not_implemented"]
             self.editor.raw_message(msg.format(typehint, self.launcher.ensime_version))
 
+        started = time.time()
         if handler:
             with catch(NotImplementedError, feature_not_supported):
                 handler(call_id, payload)
         else:
             self.log.warning('Response has not been handled: %s', Pretty(payload))
+        self.stats.response_handled(call_id, typehint, time.time() - started)
 
     def handle_indexer_ready(self, call_id, payload):
         raise NotImplementedError()
@@ -140,29 +144,23 @@ class ProtocolHandlerV1(ProtocolHandler):
             self.add_import(choice)
 
     def handle_package_info(self, call_id, payload):
-        package = payload["fullName"]
+        """Handler for `PackageInfo`, shown in the package inspector.
 
-        def add(member, indentLevel):
-            indent = "  " * indentLevel
-            t = member["declAs"]["typehint"] if member["typehint"] == "BasicTypeInfo" else ""
-            line = "{}{}: {}".format(indent, t, member["name"])
-            self.editor.append(line)
-            if indentLevel < 4:
-                for m in member["members"]:
-                    add(m, indentLevel + 1)
+        Only the members of the package are rendered, the others when expanded
+        by :meth:`toggle_inspector_node`.
+        """
+        self.package_tree = PackageTree(payload)
 
         # Create a new buffer 45 columns wide
         opts = {'buftype': 'nofile', 'bufhidden': 'wipe', 'buflisted': False,
                 'filetype': 'package_info', 'swapfile': False}
         self.editor.split_window('package_info', vertical=True, size=45, bufopts=opts)
-
-        self.editor.append(str(package))
-        for member in payload["members"]:
-            add(member, 1)
+        self.editor.replace_lines(1, 1, self.package_tree.lines())
 
     def handle_symbol_search(self, call_id, payload):
         """Handler for symbol search results"""
         self.log.debug('handle_symbol_search: in %s', Pretty(payload))
+        self.usage_list = None  # Their quickfix list is replaced
 
         syms = payload["syms"]
         qfList = []
@@ -189,15 +187,16 @@ class ProtocolHandlerV1(ProtocolHandler):
 
             open_definition = call_options.get("open_definition")
             if open_definition and f:
-                self.editor.clean_errors()
-                self.editor.doautocmd('BufLeave')
-                if call_options.get("split"):
-                    vert = call_options.get("vert")
-                    self.editor.split_window(f, vertical=vert)
-                else:
-                    self.editor.edit(f)
-                self.editor.doautocmd('BufReadPre', 'BufRead', 'BufEnter')
-                self.set_position(decl_pos)
+                with self.editor.batch():
+                    self.editor.clean_errors()
+                    self.editor.doautocmd('BufLeave')
+                    if call_options.get("split"):
+                        vert = call_options.get("vert")
+                        self.editor.split_window(f, vertical=vert)
+                    else:
+                        self.editor.edit(f)
+                    self.editor.doautocmd('BufReadPre', 'BufRead', 'BufEnter')
+                    self.set_position(decl_pos)
                 del self.call_options[call_id]
 
     def handle_string_response(self, call_id, payload):
@@ -240,6 +239,9 @@ class ProtocolHandlerV1(ProtocolHandler):
         # filter out completions without `typeInfo` field to avoid server bug. See #324
         completions = [c for c in payload["completions"] if "typeInfo" in c]
         self.suggestions = [completion_to_suggest(c) for c in completions]
+        # Capped results can't be narrowed down locally, see CompletionCache
+        self.suggestions_truncated = \
+            len(payload["completions"]) >= self.completion_max_results
         self.log.debug('handle_completion_info_list: %s', Pretty(self.suggestions))
 
     def handle_type_inspect(self, call_id, payload):
@@ -266,7 +268,11 @@ class ProtocolHandlerV2(ProtocolHandlerV1):
     """Implements response handlers for the v2 ENSIME Jerky protocol."""
 
     def handle_source_positions(self, call_id, payload):
-        """Handler for source positions"""
+        """Handler for source positions.
+
+        The first page of usages is shown at once, the others are appended
+        on the next ticks by :meth:`display_more_usages`.
+        """
         self.log.debug('handle_source_positions: in %s', Pretty(payload))
 
         call_options = self.call_options[call_id]
@@ -278,14 +284,7 @@ class ProtocolHandlerV2(ProtocolHandlerV1):
             self.editor.raw_message("No usages of <{}> found".format(word_under_cursor))
             return
 
-        qf_list = []
-        for p in positions:
-            position = p["position"]
-            preview = str(p["preview"]) if "preview" in p else "<no preview>"
-            item = self.editor.to_quickfix_item(str(position["file"]),
-                                                position["line"],
-                                                preview,
-                                                "info")
-            qf_list.append(item)
-        qf_sorted = sorted(qf_list, key=itemgetter('filename', 'lnum'))
-        self.editor.write_quickfix_list(qf_sorted, "Usages of <{}>".format(word_under_cursor))
+        title = "Usages of <{}>".format(word_under_cursor)
+        self.usage_list = Usages(title, positions, self.editor.to_quickfix_item)
+        self.editor.write_quickfix_list(self.usage_list.take(USAGES_PAGE), title)
+        self.report_truncated_usages()
@@ -0,0 +1,105 @@
+# coding: utf-8
+
+import gzip
+import json
+import os
+import time
+from collections import defaultdict
+from threading import Lock
+
+SENT = 'out'
+RECEIVED = 'in'
+
+FLUSH_INTERVAL = 1.0
+"""Seconds between flushes of a recording, so that most of it survives a crash."""
+
+
+class SessionRecorder(object):
+    """Records the websocket traffic of a client, for offline replay.
+
+    Every message sent and frame received is written as a JSON line
+    ``[seconds since start, "out" or "in", text]`` to a gzip file.
+
+    Args:
+        path (str): Where to write the recording.
+        clock (callable): Source of the timestamps.
+    """
+
+    def __init__(self, path, clock=time.time):
+        self.path = path
+        self.clock = clock
+        self.started = self._flushed = clock()
+        self._file = gzip.open(path, 'wb')
+        self._lock = Lock()
+
+    @classmethod
+    def in_dir(cls, directory):
+        """Start a recording in a new, timestamped file in ``directory``."""
+        name = time.strftime('ensime-vim-session-%Y%m%d-%H%M%S.jsonl.gz')
+        return cls(os.path.join(directory, name))
+
+    def sent(self, message):
+        self._write(SENT, message)
+
+    def received(self, frame):
+        self._write(RECEIVED, frame)
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+    def _write(self, direction, text):
+        now = self.clock()
+        line = json.dumps([round(now - self.started, 6), direction, text]) + '\n'
+        with self._lock:
+            if self._file.closed:
+                return
+            self._file.write(line.encode('utf-8'))
+            if now - self._flushed > FLUSH_INTERVAL:
+                self._file.flush()
+                self._flushed = now
+
+
+def read_session(path):
+    """Yield the ``(seconds, direction, text)`` entries of a recording."""
+    with gzip.open(path, 'rb') as recording:
+        for line in recording:
+            entry = json.loads(line.decode('utf-8'))
+            yield tuple(entry)
+
+
+def replay(client, path, realtime=False, sleep=time.sleep):
+    """Feed the frames received in a recorded session through a client.
+
+    Frames are decoded and handled as by the client, with the handlers for
+    the recorded responses. Requests recorded as sent are not sent again,
+    and replies are handled as if they were made with default call options.
+
+    Args:
+        client (EnsimeClient): Client to replay the session into, not
+            connected to a server.
+        path (str): Recording, as written by :class:`SessionRecorder`.
+        realtime (bool): Whether to wait between frames as long as in the
+            recorded session, or handle them as fast as possible.
+
+    Returns:
+        int: How many frames were replayed.
+    """
+    if not isinstance(client.call_options, defaultdict):
+        client.call_options = defaultdict(dict, client.call_options)
+
+    started = time.time()
+    replayed = 0
+    for seconds, direction, text in read_session(path):
+        if direction != RECEIVED:
+            continue
+        if realtime:
+            delay = started + seconds - time.time()
+            if delay > 0:
+                sleep(delay)
+        message = client.decode_frame(text)
+        if message:
+            client._dispatch(message)
+        replayed += 1
+    return replayed
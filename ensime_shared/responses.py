@@ -0,0 +1,60 @@
+# coding: utf-8
+
+import re
+import threading
+from collections import namedtuple
+
+CALL_ID = re.compile(r'"callId"\s*:\s*(\d+)')
+
+Message = namedtuple('Message', 'call_id typehint payload')
+"""A decoded frame from the server, with a ``payload`` ready to be handled."""
+
+
+def peek_call_id(frame):
+    """Find the ``callId`` of a raw JSON response frame without decoding it.
+
+    Quotes inside JSON strings are escaped, so an unescaped ``"callId":`` can
+    only be the key of the response envelope.
+
+    Returns:
+        Optional[int]: The call ID, or ``None`` for events without one.
+    """
+    match = CALL_ID.search(frame)
+    return int(match.group(1)) if match else None
+
+
+class ResponseFuture(object):
+    """A waitable handle for the server's response to a single request.
+
+    It is resolved on the receiver thread with the decoded response, so a
+    caller blocked in :meth:`result` wakes up as soon as its own reply arrives,
+    regardless of how many unrelated messages are queued.
+
+    Args:
+        call_id (int): The ``callId`` of the request this is a response to.
+    """
+
+    def __init__(self, call_id):
+        self.call_id = call_id
+        self._message = None
+        self._event = threading.Event()
+
+    def __repr__(self):
+        return "{}({})".format(self.__class__.__name__, self.call_id)
+
+    def done(self):
+        """bool: Whether the response has arrived."""
+        return self._event.is_set()
+
+    def set_result(self, message):
+        self._message = message
+        self._event.set()
+
+    def result(self, timeout=None):
+        """Block until the response arrives or ``timeout`` seconds elapse.
+
+        Returns:
+            Optional[Message]: The response, ``None`` if timed out.
+        """
+        self._event.wait(timeout)
+        return self._message
@@ -0,0 +1,146 @@
+# coding: utf-8
+
+"""
+Parser of ``.ensime`` configs, from S-expressions straight to dicts.
+
+Generated configs only use a small subset of S-expressions: keyword-value
+lists, strings, numbers and lists of those. It is parsed in a single pass,
+building the same values as ``sexpdata.loads`` followed by
+``ProjectConfig.parse``'s conversion to dicts, without either's intermediate
+trees. Anything outside of the subset raises :class:`UnsupportedSyntax` for
+callers to fall back to ``sexpdata``.
+"""
+
+import re
+
+OPEN, CLOSE, STRING, NUMBER, SYMBOL, NIL, TRUE, END = range(8)
+
+WHITESPACE = ' \t\n\r\x0b\x0c'
+
+TOKEN = re.compile(r'''[ \t\n\r\x0b\x0c]*(?:
+    (\()                                        # 1: open
+  | (\))                                        # 2: close
+  | "([^"\\]*)"                                 # 3: string without escapes
+  | ([^ \t\n\r\x0b\x0c()\[\]{}";'\\]+)          # 4: atom
+  | (.)                                         # 5: anything else
+)''', re.X | re.S)
+
+
+class UnsupportedSyntax(ValueError):
+    """The S-expression is outside of what :func:`loads_config` supports."""
+
+
+def loads_config(text):
+    """Parse the contents of an ``.ensime`` file.
+
+    Returns:
+        dict: Configuration values with string keys.
+
+    Raises:
+        UnsupportedSyntax: If the config is not in the supported subset, or
+            is not valid.
+    """
+    tokens = _tokenize(text)
+    kind, _ = next(tokens)
+    if kind != OPEN:
+        raise UnsupportedSyntax('expected a list')
+    config = _plist(tokens)
+    if next(tokens)[0] != END:
+        raise UnsupportedSyntax('expected a single list')
+    return config
+
+
+def _tokenize(text):
+    for match in TOKEN.finditer(text.rstrip(WHITESPACE)):
+        kind = match.lastindex
+        if kind == 1:
+            yield OPEN, None
+        elif kind == 2:
+            yield CLOSE, None
+        elif kind == 3:
+            yield STRING, match.group(3)
+        elif kind == 4:
+            yield _atom(match.group(4))
+        else:
+            raise UnsupportedSyntax('unsupported {!r}'.format(match.group(5)))
+    while True:
+        yield END, None
+
+
+def _atom(token):
+    # As converted by sexpdata
+    if token == 'nil':
+        return NIL, []
+    if token == 't':
+        return TRUE, True
+    try:
+        return NUMBER, int(token)
+    except ValueError:
+        try:
+            return NUMBER, float(token)
+        except ValueError:
+            return SYMBOL, token
+
+
+def _plist(tokens, key=None):
+    """Read the keys and values of a list, up to its end, into a dict."""
+    result = {}
+    while True:
+        if key is None:
+            kind, key = next(tokens)
+            if kind == CLOSE:
+                return result
+            if kind in (OPEN, END):
+                raise UnsupportedSyntax('expected a key')
+            key = str(key).lstrip(':')
+
+        kind, value = next(tokens)
+        if kind == CLOSE:
+            # Unpaired key, ignored
+            return result
+        result[key] = _value(kind, value, tokens)
+        key = None
+
+
+def _value(kind, value, tokens):
+    if kind == OPEN:
+        return _list(tokens)
+    if kind in (STRING, NUMBER, NIL, TRUE):
+        return value
+    raise UnsupportedSyntax('unexpected symbol or end')
+
+
+def _list(tokens):
+    """Read a list value: of dicts, a dict, or of plain values."""
+    kind, value = next(tokens)
+    if kind == CLOSE:
+        return []
+    if kind == OPEN:
+        dicts = [_plist(tokens)]
+        while True:
+            kind, _ = next(tokens)
+            if kind == CLOSE:
+                return dicts
+            if kind != OPEN:
+                raise UnsupportedSyntax('expected a list of lists')
+            dicts.append(_plist(tokens))
+    if kind == SYMBOL:
+        return _plist(tokens, value.lstrip(':'))
+    if kind == NIL:
+        raise UnsupportedSyntax('nil is a list, of dicts for sexp2dict')
+    return _plain_list(kind, value, tokens)
+
+
+def _plain_list(kind, value, tokens):
+    """Read a list as is, starting at its first element."""
+    items = []
+    while kind != CLOSE:
+        if kind == OPEN:
+            kind, value = next(tokens)
+            items.append(_plain_list(kind, value, tokens))
+        elif kind in (STRING, NUMBER, NIL, TRUE):
+            items.append(value)
+        else:
+            raise UnsupportedSyntax('unexpected symbol or end')
+        kind, value = next(tokens)
+    return items
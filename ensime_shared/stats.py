@@ -0,0 +1,150 @@
+# coding: utf-8
+
+import time
+from bisect import bisect_left
+from threading import Lock
+
+BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000)
+"""Upper bounds of the latency histogram buckets, in milliseconds."""
+
+
+class Histogram(object):
+    """Latency histogram with roughly logarithmic buckets.
+
+    Percentiles are reported as the upper bound of the bucket they fall in,
+    or the maximum seen for the last, unbounded bucket.
+    """
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def add(self, seconds):
+        ms = seconds * 1000
+        self.counts[bisect_left(BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def percentile(self, pct):
+        """Approximate ``pct`` percentile in milliseconds, 0 if empty."""
+        if not self.count:
+            return 0.0
+        rank = pct / 100.0 * self.count
+        seen = 0
+        for bound, count in zip(BUCKETS_MS, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(float(bound), self.max_ms)
+        return self.max_ms
+
+    def to_dict(self):
+        return {
+            'count': self.count,
+            'mean_ms': self.total_ms / self.count if self.count else 0.0,
+            'p50_ms': self.percentile(50),
+            'p99_ms': self.percentile(99),
+            'max_ms': self.max_ms,
+            'buckets_ms': dict(zip([str(b) for b in BUCKETS_MS] + ['inf'], self.counts)),
+        }
+
+
+class Stats(object):
+    """Counters and latency histograms of traffic with the ENSIME server.
+
+    Requests are tracked by ``typehint`` from send until their response is
+    handled, or received for replies waited for with a future. Responses and
+    events are tracked by their own ``typehint``, with separate histograms
+    for JSON decoding and for running their handler.
+    Frames are decoded on the receiver thread, so updates are serialized.
+    """
+
+    def __init__(self, clock=time.time):
+        self.clock = clock
+        self.started = clock()
+        self.sent = {}       # Request typehint -> count
+        self.latency = {}    # Request typehint -> Histogram of send to handled
+        self.decoding = {}   # Response typehint -> Histogram
+        self.handling = {}   # Response typehint -> Histogram
+        self._inflight = {}  # Call ID -> (request typehint, time sent)
+        self._lock = Lock()
+
+    def request_sent(self, call_id, typehint):
+        with self._lock:
+            self.sent[typehint] = self.sent.get(typehint, 0) + 1
+            self._inflight[call_id] = (typehint, self.clock())
+
+    def request_dropped(self, call_id):
+        """Stop tracking a request whose response won't be handled."""
+        with self._lock:
+            self._inflight.pop(call_id, None)
+
+    def response_received(self, call_id):
+        """Record the latency of a request whose reply is handed to the caller
+        waiting for it on receipt, then stop tracking it."""
+        with self._lock:
+            self._record_latency(call_id)
+
+    def response_decoded(self, typehint, seconds):
+        with self._lock:
+            self._histogram(self.decoding, typehint).add(seconds)
+
+    def response_handled(self, call_id, typehint, seconds):
+        """Record the time spent in a handler, and the request's latency."""
+        with self._lock:
+            self._histogram(self.handling, typehint).add(seconds)
+            self._record_latency(call_id)
+
+    def _record_latency(self, call_id):
+        request = self._inflight.pop(call_id, None)
+        if request:
+            req_typehint, sent_at = request
+            self._histogram(self.latency, req_typehint).add(self.clock() - sent_at)
+
+    def to_dict(self):
+        def histograms(by_typehint):
+            return dict((k, h.to_dict()) for k, h in by_typehint.items())
+
+        with self._lock:
+            return {
+                'uptime_s': self.clock() - self.started,
+                'sent': dict(self.sent),
+                'in_flight': len(self._inflight),
+                'latency': histograms(self.latency),
+                'decoding': histograms(self.decoding),
+                'handling': histograms(self.handling),
+            }
+
+    def report(self):
+        """Human-readable summary, as a list of lines."""
+        with self._lock:
+            return self._report()
+
+    def _report(self):
+        row = '{:<34} {:>7} {:>9.1f} {:>9.1f} {:>9.1f}'
+        header = '{:<34} {:>7} {:>9} {:>9} {:>9}'
+        lines = [header.format('Request (send to handled)', 'count', 'p50 ms', 'p99 ms', 'max ms')]
+        for typehint in sorted(self.sent):
+            h = self.latency.get(typehint, Histogram())
+            lines.append(row.format(typehint, self.sent[typehint],
+                                    h.percentile(50), h.percentile(99), h.max_ms))
+
+        lines.append('')
+        lines.append(header.format('Response (decode / handler)', 'count', 'p50 ms', 'p99 ms',
+                                   'max ms'))
+        for typehint in sorted(self.handling):
+            for name, h in (('decode', self.decoding.get(typehint, Histogram())),
+                            ('handler', self.handling[typehint])):
+                label = '{} {}'.format(typehint, name)
+                lines.append(row.format(label, h.count,
+                                        h.percentile(50), h.percentile(99), h.max_ms))
+        return lines
+
+    @staticmethod
+    def _histogram(by_typehint, typehint):
+        histogram = by_typehint.get(typehint)
+        if histogram is None:
+            histogram = by_typehint[typehint] = Histogram()
+        return histogram
@@ -1,36 +1,108 @@
+from threading import current_thread
+
 REFRESH_TIMER = 1000
 
+BUSY_INTERVAL = 50
+"""Milliseconds between ticks while replies are expected or being handled."""
+
+IDLE_INTERVAL = 2000
+"""Milliseconds between ticks otherwise, for housekeeping like connecting."""
+
 
 class Ticker(object):
+    """Ticks the clients, so that they handle the messages they received.
+
+    On Neovim, receiving a message schedules a tick right away with
+    ``async_call``, and a timer ticks every ``IDLE_INTERVAL`` otherwise. On Vim
+    the timer can't be woken up from the receiver thread, so it speeds up to
+    ``BUSY_INTERVAL`` while clients are busy instead. Vim without timers
+    falls back to repeating ``CursorHold`` events.
 
-    def __init__(self, _vim):
+    Args:
+        on_tick (callable): Ticks all the clients, then calls :meth:`ticked`.
+    """
+
+    def __init__(self, _vim, on_tick):
         self._vim = _vim
+        self._on_tick = on_tick
+        self._main_thread = current_thread()
         self.has_timers = bool(int(self._vim.eval("has('timers')")))
+        self.isneovim = bool(int(self._vim.eval("has('nvim')")))
+        self._scheduled = False
 
         if self.has_timers:
             self._timer = None
-            self._start_refresh_timer()
+            self._interval = None
+            self._start_refresh_timer(IDLE_INTERVAL)
+
+    def watch(self, client):
+        """Get woken up by a client when it sends or receives messages."""
+        client.wakeup = self.wake
+
+    def wake(self):
+        """Tick soon. Called from any thread."""
+        if self.isneovim:
+            if not self._scheduled:
+                self._scheduled = True
+                self._vim.async_call(self._drain)
+        elif self.has_timers and current_thread() is self._main_thread:
+            self._start_refresh_timer(BUSY_INTERVAL)
 
     def tick(self, client):
+        """Tick a client, unless the current buffer isn't one it handles.
+
+        Pending usages are shown whatever the buffer, they go to the quickfix
+        list.
+
+        Returns:
+            bool: Whether the client was ticked.
+        """
         filename = client.editor.path()
 
         # XXX is this necessary ?
         if not client.editor.is_buffer_ensime_compatible():
-            return
+            if client.usages_pending():
+                client.display_more_usages()
+                return True
+            return False
 
         client.tick(filename)
 
         if not self.has_timers:
             self._repeat_cursor_hold()
+        return True
+
+    def ticked(self, ticked):
+        """Schedule the next tick, after the clients ``ticked`` were.
+
+        Clients that weren't ticked are left to the idle timer, as ticking
+        them sooner wouldn't get anything done.
+        """
+        if self.isneovim:
+            # Yield to the UI between batches of a flood
+            if any(client.has_backlog() for client in ticked):
+                self.wake()
+        elif self.has_timers:
+            busy = any(client.busy() for client in ticked)
+            self._start_refresh_timer(BUSY_INTERVAL if busy else IDLE_INTERVAL)
+
+    def _drain(self):
+        self._scheduled = False
+        self._on_tick()
 
     def _repeat_cursor_hold(self):
         self._vim.options['updatetime'] = REFRESH_TIMER
         self._vim.command('call feedkeys("f\e")')
 
-    def _start_refresh_timer(self):
-        """Start the Vim timer. """
-        if not self._timer:
-            self._timer = self._vim.eval(
-                "timer_start({}, 'EnTick', {{'repeat': -1}})"
-                .format(REFRESH_TIMER)
-            )
+    def _start_refresh_timer(self, interval):
+        """Start the Vim timer, or restart it with a new interval."""
+        if interval == self._interval:
+            return
+
+        if self._timer is not None:
+            self._vim.command('call timer_stop({})'.format(self._timer))
+        self._timer = self._vim.eval(
+            "timer_start({}, 'EnTick', {{'repeat': -1}})"
+            .format(interval)
+        )
+        self._interval = interval
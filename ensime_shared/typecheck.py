@@ -1,11 +1,16 @@
 # coding: utf-8
 
+import time
+
 
 class TypecheckHandler(object):
 
     def __init__(self):
         self.currently_buffering_typechecks = False
+        self.typecheck_started = None
         self.buffered_notes = []
+        # Whether notes came since last displayed, see display_new_notes
+        self.notes_changed = False
         super(TypecheckHandler, self).__init__()
 
     def buffer_typechecks(self, call_id, payload):
@@ -15,19 +20,36 @@ class TypecheckHandler(object):
                 self.buffered_notes.append(note)
 
     def buffer_typechecks_and_display(self, call_id, payload):
-        """Adds typecheck events to the buffer, and displays them right away.
+        """Adds typecheck events to the buffer, and displays them on next tick.
+
+        Events often come in bursts, so their notes are coalesced and drawn
+        once by :meth:`display_new_notes` rather than once per event. Events
+        without notes count too, they clear the notes of a previous typecheck.
 
         This is a workaround for this issue:
         https://github.com/ensime/ensime-server/issues/1616
         """
         self.buffer_typechecks(call_id, payload)
-        self.editor.display_notes(self.buffered_notes)
+        if self.currently_buffering_typechecks:
+            self.notes_changed = True
+
+    def display_new_notes(self):
+        """Displays the notes of the typecheck, if some came since the last time.
+
+        They replace the notes displayed before, which may be from a previous
+        typecheck. Only highlights that changed are touched.
+        """
+        if self.notes_changed:
+            self.editor.display_notes(list(self.buffered_notes))
+            self.notes_changed = False
 
     def start_typechecking(self):
         self.log.info('Readying typecheck...')
         self.currently_buffering_typechecks = True
+        self.typecheck_started = time.time()
         if self.currently_buffering_typechecks:
             self.buffered_notes = []
+            self.notes_changed = False
 
     def handle_typecheck_complete(self, call_id, payload):
         """Handles ``NewScalaNotesEvent```.
@@ -42,3 +64,4 @@ class TypecheckHandler(object):
         self.editor.display_notes(self.buffered_notes)
         self.currently_buffering_typechecks = False
         self.buffered_notes = []
+        self.notes_changed = False
@@ -0,0 +1,83 @@
+# coding: utf-8
+
+from collections import defaultdict
+from itertools import islice
+
+USAGES_PAGE = 500
+"""Usages written to the quickfix list as soon as they are received."""
+
+USAGES_BATCH = 5000
+"""Usages appended to the quickfix list per tick, after the first page."""
+
+MAX_USAGES = 20000
+"""Usages shown at most, until more are asked for with ``:EnUsagesMore``."""
+
+
+class Usages(object):
+    """Usages of a symbol, handed out in batches to fill the quickfix list.
+
+    Positions are put in buckets by file, and the files and the positions in
+    each are only sorted as batches get to them. The first page is ready
+    without converting or sorting them all, while batches still come in the
+    order of a sort by file and line.
+
+    Args:
+        title (str): Title of the quickfix list.
+        positions (List[dict]): Positions with previews, from ``SourcePositions``.
+        to_item (callable): Makes a quickfix item, like
+            :meth:`Editor.to_quickfix_item`.
+        limit (Optional[int]): Number of usages to show at most, see
+            :meth:`more`. ``MAX_USAGES`` if ``None``.
+
+    Attributes:
+        shown (int): Number of usages handed out.
+        total (int): Number of usages.
+    """
+
+    def __init__(self, title, positions, to_item, limit=None):
+        self.title = title
+        self.shown = 0
+        self.total = len(positions)
+        self.limit = MAX_USAGES if limit is None else limit
+        self._to_item = to_item
+
+        by_file = defaultdict(list)
+        for p in positions:
+            by_file[str(p["position"]["file"])].append(p)
+        self._items = self._sorted_items(by_file)
+
+    @property
+    def pending(self):
+        """bool: Whether there are usages left to show under the limit."""
+        return self.shown < min(self.total, self.limit)
+
+    @property
+    def truncated(self):
+        """bool: Whether usages are left out because of the limit."""
+        return self.shown < self.total and not self.pending
+
+    def take(self, count):
+        """Hand out the next usages as quickfix items, up to the limit.
+
+        Args:
+            count (int): Number of usages to take at most.
+
+        Returns:
+            List[dict]
+        """
+        count = max(min(count, self.limit - self.shown), 0)
+        items = list(islice(self._items, count))
+        self.shown += len(items)
+        return items
+
+    def more(self, count=None):
+        """Raise the limit, to show ``count`` more usages, ``MAX_USAGES`` if ``None``."""
+        self.limit = self.shown + (MAX_USAGES if count is None else count)
+
+    def _sorted_items(self, by_file):
+        for filename in sorted(by_file):
+            positions = by_file.pop(filename)
+            positions.sort(key=lambda p: p["position"]["line"])
+            for p in positions:
+                preview = str(p["preview"]) if "preview" in p else "<no preview>"
+                yield self._to_item(filename, p["position"]["line"], preview, "info")
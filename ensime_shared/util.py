@@ -1,6 +1,7 @@
 # coding: utf-8
 
 import os
+import re
 from contextlib import contextmanager
 from pprint import pformat
 
@@ -42,6 +43,43 @@ class Util:
         return package
 
 
+OPERATOR_CHARS = r'!#%&*+\-/:<=>?@\\^|~'
+
+IDENTIFIER = re.compile(r"""
+    `[^`]+`                                     # backquoted
+  | (?:[^\W\d]|\$)[\w$]*(?:(?<=_)[{0}]+)?       # alphanumeric, maybe with an operator suffix
+  | [{0}]+                                      # operator
+""".format(OPERATOR_CHARS), re.U | re.X)
+
+
+def identifier_bounds(line, col):
+    """Find the Scala identifier at a column of a line of code.
+
+    Identifiers are alphanumeric like ``foo_=``, operators like ``::`` or
+    backquoted like ```type```. Only ASCII operator characters are recognized.
+
+    Args:
+        line (str): The line of code.
+        col (int): Column of the cursor, 0-based.
+
+    Returns:
+        Tuple[int, int]: Columns of the first and last characters of the
+        identifier at ``col``, or of the next one on the line if there is
+        none, like Vim's ``e`` and ``b`` motions. ``(col, col)`` if there is
+        neither.
+    """
+    for match in IDENTIFIER.finditer(line):
+        if match.end() > col:
+            return match.start(), match.end() - 1
+    return col, col
+
+
+def chunks(sequence, size):
+    """Split a sequence into consecutive slices of at most ``size`` items."""
+    for i in range(0, len(sequence), size):
+        yield sequence[i:i + size]
+
+
 @contextmanager
 def catch(exception, handler=lambda e: None):
     """If exception runs handler."""
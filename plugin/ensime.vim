@@ -74,6 +74,7 @@ command! -nargs=* -range EnNoTeardown call ensime#com_en_no_teardown([<f-args>],
 command! -nargs=* -range EnTypeCheck call ensime#com_en_type_check([<f-args>], '')
 command! -nargs=* -range EnType call ensime#com_en_type([<f-args>], '')
 command! -nargs=* -range EnUsages call ensime#com_en_usages([<f-args>], '')
+command! -nargs=0 -range EnUsagesMore call ensime#com_en_usages_more([<f-args>], '')
 command! -nargs=* -range EnSearch call ensime#com_en_sym_search([<f-args>], '')
 command! -nargs=* -range EnShowPackage call ensime#com_en_package_inspect([<f-args>], '')
 command! -nargs=* -range EnDeclaration call ensime#com_en_declaration([<f-args>], '')
@@ -95,6 +96,7 @@ command! -nargs=* -range EnDebugStep call ensime#com_en_debug_step([<f-args>], '
 command! -nargs=* -range EnDebugStepOut call ensime#com_en_debug_step_out([<f-args>], '')
 command! -nargs=* -range EnDebugNext call ensime#com_en_debug_next([<f-args>], '')
 command! -nargs=0 -range EnClients call ensime#com_en_clients([<f-args>], '')
+command! -nargs=* -range EnStats call ensime#com_en_stats([<f-args>], '')
 command! -nargs=* -range EnToggleFullType call ensime#com_en_toggle_fulltype([<f-args>], '')
 command! -nargs=* -range EnOrganizeImports call ensime#com_en_organize_imports([<f-args>], '')
 command! -nargs=* -range EnAddImport call ensime#com_en_add_import([<f-args>], '')
@@ -103,6 +105,10 @@ function! EnPackageDecl() abort
     return ensime#fun_en_package_decl()
 endfunction
 
+function! EnPackageToggle() abort
+    return ensime#fun_en_package_toggle()
+endfunction
+
 function! EnCompleteFunc(a, b) abort
     return ensime#fun_en_complete_func(a:a, a:b)
 endfunction
@@ -61,6 +61,10 @@ class NeovimEnsime(Ensime):
     def com_en_usages(self, *args, **kwargs):
         super(NeovimEnsime, self).com_en_usages(*args, **kwargs)
 
+    @neovim.command('EnUsagesMore', range='', nargs='0', sync=True)
+    def com_en_usages_more(self, *args, **kwargs):
+        super(NeovimEnsime, self).com_en_usages_more(*args, **kwargs)
+
     @neovim.command('EnSearch', **command_params)
     def com_en_sym_search(self, *args, **kwargs):
         super(NeovimEnsime, self).com_en_sym_search(*args, **kwargs)
@@ -149,6 +153,10 @@ class NeovimEnsime(Ensime):
     def fun_en_package_decl(self, *args, **kwargs):
         super(NeovimEnsime, self).fun_en_package_decl(*args, **kwargs)
 
+    @neovim.function('EnPackageToggle', sync=True)
+    def fun_en_package_toggle(self, *args, **kwargs):
+        super(NeovimEnsime, self).fun_en_package_toggle(*args, **kwargs)
+
     @neovim.command('EnInline', **command_params)
     def com_en_inline(self, *args, **kwargs):
         super(NeovimEnsime, self).com_en_inline(*args, **kwargs)
@@ -165,6 +173,10 @@ class NeovimEnsime(Ensime):
     def com_en_clients(self, *args, **kwargs):
         super(NeovimEnsime, self).com_en_clients(*args, **kwargs)
 
+    @neovim.command('EnStats', **command_params)
+    def com_en_stats(self, *args, **kwargs):
+        super(NeovimEnsime, self).com_en_stats(*args, **kwargs)
+
     @neovim.autocmd('VimEnter', **autocmd_params)
     def au_vim_enter(self, *args, **kwargs):
         super(NeovimEnsime, self).au_vim_enter(*args, **kwargs)
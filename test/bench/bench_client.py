@@ -0,0 +1,141 @@
+# coding: utf-8
+"""End-to-end benchmark of EnsimeClientV2 against a fake ENSIME server.
+
+A real client talks over a websocket to :class:`FakeEnsimeServer`, with an
+in-memory editor. Latency is measured from the user's command until its
+results reach the editor, ticking the client like the Vim timer would (only
+faster, so that the tick interval doesn't dominate). Run from the
+repository root::
+
+    python -m test.bench.bench_client --size 500 --delay 0.005
+"""
+
+import argparse
+import time
+
+from ensime_shared.client import EnsimeClientV2
+from test.bench.bench_receiver import percentile
+from test.bench.doubles import FakeLauncher, FakeProcess, MemoryEditor
+from test.bench.fakeensime import FakeEnsimeServer, SOURCE
+
+
+class Timeout(Exception):
+    pass
+
+
+def connect(server, lines):
+    editor = MemoryEditor(SOURCE, lines)
+    launcher = FakeLauncher()
+    client = EnsimeClientV2(editor, launcher)
+    client.ensime = FakeProcess(server.port)
+    client.ensime_server = server.url
+    client.connect_ensime_server()
+    return client
+
+
+def drain(client, done, tick, timeout=30):
+    """Tick the client until ``done()``, returns the number of ticks."""
+    ticks = 0
+    deadline = time.time() + timeout
+    while not done():
+        if time.time() > deadline:
+            raise Timeout()
+        client.unqueue_and_display(client.editor.path())
+        ticks += 1
+        if not done():
+            time.sleep(tick)
+    return ticks
+
+
+def bench_completion(client, server, iterations, tick):
+    """Omni completion at a new site each time, so the cache never hits."""
+    editor = client.editor
+    samples = []
+    for i in range(iterations):
+        row = i % editor.line_count() + 1
+        editor.set_cursor(row, len(editor.getline(row)))
+        client.completion_cache.clear()
+
+        started = time.time()
+        client.complete_func(1, '')
+        suggestions = client.complete_func(0, 'me')
+        samples.append(time.time() - started)
+        assert suggestions, 'no completions'
+    return samples
+
+
+def bench_quickfix(request):
+    """Commands filling the quickfix list, when results are handled on a tick."""
+    def bench(client, server, iterations, tick):
+        editor = client.editor
+        samples = []
+        for i in range(iterations):
+            expected = len(editor.quickfix) + 1
+            started = time.time()
+            request(client)
+            drain(client, lambda: len(editor.quickfix) == expected, tick)
+            samples.append(time.time() - started)
+        return samples
+    return bench
+
+
+def bench_typecheck_flood(events):
+    """A typecheck reported as a flood of notes events, one sample per run."""
+    def bench(client, server, iterations, tick):
+        samples = []
+        for i in range(iterations):
+            client.type_check_cmd([])
+            started = time.time()
+            server.flood_notes(events, server.size)
+            drain(client, lambda: not client.currently_buffering_typechecks, tick)
+            samples.append(time.time() - started)
+        return samples
+    return bench
+
+
+def report(name, samples, items):
+    total = sum(samples)
+    print('{:<16} {:>5} runs   p50 {:>8.2f} ms   p99 {:>8.2f} ms   {:>10.0f} items/s'.format(
+        name, len(samples),
+        percentile(samples, 50) * 1000, percentile(samples, 99) * 1000,
+        items * len(samples) / total if total else 0))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=50)
+    parser.add_argument('--size', type=int, default=100,
+                        help='entries in each reply: completions, usages, notes...')
+    parser.add_argument('--delay', type=float, default=0.0,
+                        help='seconds the server takes to reply')
+    parser.add_argument('--events', type=int, default=50,
+                        help='notes events in each typecheck flood')
+    parser.add_argument('--tick', type=float, default=0.001,
+                        help='seconds between client ticks')
+    parser.add_argument('--stats', action='store_true',
+                        help='print the client statistics, as :EnStats does')
+    args = parser.parse_args()
+
+    server = FakeEnsimeServer(size=args.size, delay=args.delay).start()
+    lines = ['    val v{} = bench.me'.format(i) for i in range(1000)]
+    client = connect(server, lines)
+
+    scenarios = [
+        ('completion', bench_completion, args.size),
+        ('usages', bench_quickfix(lambda c: c.usages()), args.size),
+        ('symbol search', bench_quickfix(lambda c: c.symbol_search(['Type'])), args.size),
+        ('typecheck flood', bench_typecheck_flood(args.events), args.events * args.size),
+    ]
+    try:
+        for name, bench, items in scenarios:
+            report(name, bench(client, server, args.iterations, args.tick), items)
+        if args.stats:
+            print('\n'.join([''] + client.stats.report()))
+    finally:
+        client.teardown()
+        client.launcher.cleanup()
+        server.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+# coding: utf-8
+"""Benchmark of the installed JSON codecs decoding frames from the server.
+
+Frames come from recorded sessions (see ``ENSIME_VIM_RECORD``), or are canned
+payloads of the fake server when none is given. Run from the repository root::
+
+    python -m test.bench.bench_codec [--size 1000] [SESSION...]
+"""
+
+import argparse
+import json
+import time
+
+from ensime_shared.codec import CODECS
+from ensime_shared.recorder import read_session, RECEIVED
+from test.bench import fakeensime
+
+
+def recorded_frames(paths):
+    return [text for path in paths
+            for _, direction, text in read_session(path) if direction == RECEIVED]
+
+
+def canned_frames(size):
+    payloads = [fakeensime.completions(size), fakeensime.source_positions(size),
+                fakeensime.notes(size), fakeensime.symbol_search_results(size)]
+    return [json.dumps({'callId': i, 'payload': p}) for i, p in enumerate(payloads)]
+
+
+def bench(codec, frames, repeat):
+    started = time.time()
+    for _ in range(repeat):
+        for frame in frames:
+            codec.loads(frame)
+    return time.time() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('sessions', nargs='*', metavar='SESSION')
+    parser.add_argument('--size', type=int, default=1000,
+                        help='entries in canned payloads, without sessions')
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    frames = recorded_frames(args.sessions) if args.sessions else canned_frames(args.size)
+    volume = sum(len(f) for f in frames) * args.repeat
+
+    baseline = None
+    for name, codec in reversed(CODECS.items()):
+        elapsed = bench(codec, frames, args.repeat)
+        baseline = baseline or elapsed
+        print('{:<8} {:>6} frames {:>9.1f} MB/s {:>7.2f}x'.format(
+            name, len(frames) * args.repeat, volume / elapsed / 1e6, baseline / elapsed))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+# coding: utf-8
+"""Benchmark of parsing a big ``.ensime`` config, cold and cached.
+
+``sexpdata`` times the previous parser, which the current one falls back to.
+
+The synthetic config has subprojects sharing ``--entries`` classpath entries
+in total, like a big multi-module build. Run from the repository root::
+
+    python -m test.bench.bench_config --entries 50000
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from ensime_shared import sexp
+from ensime_shared.config import ProjectConfig
+
+SUBPROJECT = '''(:name "module{i}" :module-name "module{i}"
+   :source-roots ("{root}/module{i}/src/main/scala" "{root}/module{i}/src/main/java")
+   :targets ("{root}/module{i}/target/scala-2.11/classes")
+   :test-targets ("{root}/module{i}/target/scala-2.11/test-classes")
+   :depends-on-modules ()
+   :compile-deps ({jars})
+   :runtime-deps ()
+   :test-deps ()
+   :doc-jars ()
+   :reference-source-roots ())'''
+
+
+def write_config(root, entries, modules):
+    per_module = entries // modules
+    jar = '"/home/user/.ivy2/cache/org.example/lib{}/jars/lib{}-1.0.{}.jar"'
+    subprojects = []
+    for i in range(modules):
+        jars = ' '.join(jar.format(j, j, i) for j in range(per_module))
+        subprojects.append(SUBPROJECT.format(i=i, root=root, jars=jars))
+
+    path = os.path.join(root, '.ensime')
+    with open(path, 'w') as config:
+        config.write('(:root-dir "{0}" :cache-dir "{0}/.ensime_cache" :name "bench"\n'
+                     ' :scala-version "2.11.8" :java-home "/usr/lib/jvm/java-8"\n'
+                     ' :subprojects ({1}))\n'.format(root, '\n  '.join(subprojects)))
+    return path
+
+
+def timed(function, *args):
+    started = time.time()
+    function(*args)
+    return time.time() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--entries', type=int, default=50000)
+    parser.add_argument('--modules', type=int, default=50)
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix='ensime-vim-bench')
+    try:
+        path = write_config(root, args.entries, args.modules)
+        print('{} entries, {:.1f} MB'.format(args.entries, os.path.getsize(path) / 1e6))
+        with open(path) as config:
+            text = config.read()
+        assert sexp.loads_config(text) == ProjectConfig.parse_sexpdata(text)
+        print('sexpdata     {:>9.2f} ms'.format(
+            timed(ProjectConfig.parse_sexpdata, text) * 1000))
+        print('loads_config {:>9.2f} ms'.format(timed(sexp.loads_config, text) * 1000))
+        print('parse        {:>9.2f} ms'.format(timed(ProjectConfig.parse, path) * 1000))
+        print('cold open    {:>9.2f} ms'.format(timed(ProjectConfig, path) * 1000))
+        print('warm open    {:>9.2f} ms'.format(timed(ProjectConfig, path) * 1000))
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,148 @@
+# coding: utf-8
+"""Benchmark of editor round trips in handlers, batched or not, and in
+conversions of offsets to positions.
+
+The handlers run against a fake Neovim which counts the requests it gets
+and takes ``--latency`` to answer each, like msgpack RPC does. Run from the
+repository root::
+
+    python -m test.bench.bench_editor --latency 0.0005
+"""
+
+import argparse
+import time
+from contextlib import contextmanager
+
+from ensime_shared.client import EnsimeClientV2
+from ensime_shared.editor import Editor
+from test.bench.doubles import FakeLauncher
+
+
+class CountingNeovim(object):
+    """Fake Neovim counting requests, of which only a few are implemented."""
+
+    def __init__(self, latency):
+        self.latency = latency
+        self.requests = 0
+        self.api = self
+        self.current = self
+        self.window = self
+        self.name = 'Current.scala'
+        self.number = 1
+        self.vars = {}
+        self.lines = ['    val x{} = {}'.format(n, n) for n in range(2000)]
+        self.changedtick = 1
+        self._cursor = (1, 0)
+
+    def _request(self):
+        self.requests += 1
+        time.sleep(self.latency)
+
+    def command(self, command):
+        self._request()
+
+    def eval(self, expr):
+        self._request()
+        if expr == "has('nvim')":
+            return 1
+        if expr == 'b:changedtick':
+            return self.changedtick
+        if expr.startswith("[bufnr('%'), b:changedtick]"):  # Editor.line_offsets()
+            result = [self.number, self.changedtick]
+            if "'{}': {}}}".format(self.number, self.changedtick) not in expr:
+                result.append(list(self.lines))
+            return result
+        return 0
+
+    def __getitem__(self, index):
+        self._request()
+        return self.lines[index]
+
+    def call_atomic(self, calls):
+        self._request()
+        return [[None] * len(calls), None]
+
+    def async_call(self, function, *args):
+        function(*args)
+
+    @property
+    def buffer(self):
+        self._request()
+        return self
+
+    @property
+    def cursor(self):
+        self._request()
+        return self._cursor
+
+    @cursor.setter
+    def cursor(self, position):
+        self._request()
+        self._cursor = position
+
+
+@contextmanager
+def unbatched():
+    yield
+
+
+SYMBOL_INFO = {'typehint': 'SymbolInfo', 'name': 'Foo', 'localName': 'Foo',
+               'declPos': {'typehint': 'LineSourcePosition', 'file': 'Foo.scala', 'line': 42}}
+
+
+def bench_symbol_info(client, vim, iterations, split):
+    """Jumping to a declaration, :EnDeclaration or :EnDeclarationSplit."""
+    requests = vim.requests
+    started = time.time()
+    for call_id in range(iterations):
+        client.call_options[call_id] = {'open_definition': True, 'split': split}
+        client.handle_symbol_info(call_id, SYMBOL_INFO)
+    elapsed = time.time() - started
+    return (vim.requests - requests) / iterations, elapsed / iterations
+
+
+def bench_point2pos(editor, vim, iterations, typing):
+    """Positions of offsets, with the buffer changing between them or not."""
+    requests = vim.requests
+    started = time.time()
+    for offset in range(iterations):
+        if typing:
+            vim.changedtick += 1
+        editor.point2pos(offset)
+    elapsed = time.time() - started
+    return (vim.requests - requests) / iterations, elapsed / iterations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--latency', type=float, default=0.0005,
+                        help='seconds taken by Neovim to answer a request')
+    args = parser.parse_args()
+
+    launcher = FakeLauncher()
+    try:
+        for batch in (False, True):
+            vim = CountingNeovim(args.latency)
+            client = EnsimeClientV2(Editor(vim), launcher)
+            if not batch:
+                client.editor.batch = unbatched
+            for split in (False, True):
+                requests, latency = bench_symbol_info(client, vim, args.iterations, split)
+                print('{:<10} {:<8} {:>5.1f} requests {:>8.2f} ms'.format(
+                    'split' if split else 'edit', 'batched' if batch else 'unbatched',
+                    requests, latency * 1000))
+            client.teardown()
+
+        vim = CountingNeovim(args.latency)
+        editor = Editor(vim)
+        for typing in (False, True):
+            requests, latency = bench_point2pos(editor, vim, args.iterations, typing)
+            print('{:<10} {:<8} {:>5.1f} requests {:>8.2f} ms'.format(
+                'point2pos', 'typing' if typing else 'idle', requests, latency * 1000))
+    finally:
+        launcher.cleanup()
+
+
+if __name__ == '__main__':
+    main()
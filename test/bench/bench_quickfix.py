@@ -0,0 +1,92 @@
+# coding: utf-8
+"""Benchmark of writing big quickfix lists, as for usages of a hot symbol.
+
+Compares formatting the list into a ``setqflist()`` command, as was done
+before, with passing it as data through a fake Neovim. The fake packs calls
+with ``msgpack`` like the real client does, when it is installed. Run from
+the repository root::
+
+    python -m test.bench.bench_quickfix --sizes 100 10000 100000
+"""
+
+import argparse
+import time
+
+from ensime_shared.editor import Editor
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+class PackingNeovim(object):
+    """Fake Neovim serializing what it is sent, and timing the first chunk."""
+
+    def __init__(self):
+        self.sent = 0
+        self.first_chunk = None
+        self._started = None
+
+    def _send(self, *args):
+        if msgpack:
+            self.sent += len(msgpack.packb(args, use_bin_type=True))
+        if self.first_chunk is None:
+            self.first_chunk = time.time() - self._started
+
+    def start(self):
+        self.first_chunk = None
+        self._started = time.time()
+
+    def eval(self, expr):
+        return 1
+
+    def call(self, name, *args):
+        self._send(name, args)
+
+    def command(self, command):
+        self._send(command)
+
+
+def items(size):
+    return [{'filename': '/home/user/project/src/main/scala/Module{}.scala'.format(i % 500),
+             'lnum': i % 3000 + 1,
+             'text': "    val x = symbol(\"{}\") // it's used here".format(i),
+             'type': 'n'}
+            for i in range(size)]
+
+
+def bench_formatted(qflist):
+    started = time.time()
+    command = "call setqflist({!s}, 'r', 'Ensime - {}')".format(qflist, 'Usages')
+    return time.time() - started, len(command)
+
+
+def bench_data(qflist):
+    vim = PackingNeovim()
+    editor = Editor(vim)
+    vim.start()
+    started = time.time()
+    editor.write_quickfix_list(qflist, 'Usages')
+    return time.time() - started, vim.first_chunk, vim.sent
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 10000, 100000])
+    args = parser.parse_args()
+
+    if not msgpack:
+        print('msgpack is not installed, data is passed without being packed')
+    for size in args.sizes:
+        qflist = items(size)
+        elapsed, length = bench_formatted(qflist)
+        print('{:>7} items formatted {:>9.2f} ms {:>10} bytes'.format(
+            size, elapsed * 1000, length))
+        elapsed, first_chunk, sent = bench_data(qflist)
+        print('{:>7} items as data   {:>9.2f} ms {:>10} bytes, first chunk in {:.2f} ms'.format(
+            size, elapsed * 1000, sent, first_chunk * 1000))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,144 @@
+# coding: utf-8
+"""Benchmark of the websocket receiver thread: throughput and receive latency.
+
+Compares the previous receiver loop, which slept after every frame, with
+:meth:`EnsimeClient.queue_poll`. Run from the repository root::
+
+    python -m test.bench.bench_receiver --messages 200
+"""
+
+import argparse
+import json
+import logging
+import threading
+import time
+
+import websocket
+
+from ensime_shared.client import EnsimeClient
+from ensime_shared.codec import get_codec
+from ensime_shared.responses import Message
+from ensime_shared.stats import Stats
+from test.bench.fakeserver import FakeWebSocketServer
+
+try:
+    from queue import Queue, Empty
+except ImportError:
+    from Queue import Queue, Empty
+
+
+class ReceiverStub(object):
+    """Just enough of an ``EnsimeClient`` to run its receiver loop."""
+
+    def __init__(self, ws):
+        self.ws = ws
+        self.running = True
+        self.queue = Queue()
+        self.log = logging.getLogger('bench')
+        self.number_try_connection = 0
+        self.pending = {}
+        self.superseded = set()
+        self._pending_lock = threading.Lock()
+        self.recorder = None
+        self.wakeup = None
+        self.codec = get_codec()
+        self.stats = Stats()
+
+    _receive = EnsimeClient._receive
+    _drop_superseded = EnsimeClient._drop_superseded
+    decode_frame = EnsimeClient.decode_frame
+
+    def teardown(self):
+        self.running = False
+
+    def _display_ws_warning(self):
+        pass
+
+
+def legacy_queue_poll(client, sleep_t=0.5):
+    """The receiver loop as it was: sleep after each received frame."""
+    while client.running:
+        if client.ws:
+            try:
+                client.queue.put(client.ws.recv())
+            except websocket.WebSocketException:
+                client.running = False
+        time.sleep(sleep_t)
+
+
+def notes_event(index):
+    return json.dumps({
+        'callId': None,
+        'payload': {'typehint': 'NewScalaNotesEvent',
+                    'isFull': False,
+                    'notes': [],
+                    'index': index,
+                    'sentAt': time.time()}})
+
+
+def sent_at(item):
+    """When a frame received by either loop was sent, the old one doesn't decode."""
+    payload = item.payload if isinstance(item, Message) else json.loads(item)['payload']
+    return payload['sentAt']
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def run(poll, messages, interval):
+    def push(server):
+        for i in range(messages):
+            server.send(notes_event(i))
+            if interval:
+                time.sleep(interval)
+
+    server = FakeWebSocketServer(on_connect=push).start()
+    ws = websocket.create_connection(server.url, enable_multithread=True)
+    client = ReceiverStub(ws)
+    thread = threading.Thread(target=poll, args=(client,))
+    thread.daemon = True
+
+    latencies = []
+    started = time.time()
+    thread.start()
+    try:
+        while len(latencies) < messages:
+            item = client.queue.get(timeout=messages * 0.5 + 10)
+            received = time.time()
+            latencies.append(received - sent_at(item))
+    except Empty:
+        pass
+    elapsed = time.time() - started
+
+    client.running = False
+    ws.abort()
+    thread.join(1.0)
+    ws.shutdown()
+    server.stop()
+    return len(latencies), elapsed, latencies
+
+
+def report(name, received, elapsed, latencies):
+    print('{:<10} {:>6} msgs {:>9.1f} msgs/s   p50 {:>9.2f} ms   p99 {:>9.2f} ms'.format(
+        name, received, received / elapsed,
+        percentile(latencies, 50) * 1000, percentile(latencies, 99) * 1000))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--messages', type=int, default=200)
+    parser.add_argument('--legacy-messages', type=int, default=20,
+                        help='the old loop takes 0.5s per frame, keep this small')
+    parser.add_argument('--interval', type=float, default=0.0,
+                        help='seconds between frames sent by the server')
+    args = parser.parse_args()
+
+    report('before', *run(legacy_queue_poll, args.legacy_messages, args.interval))
+    report('after', *run(EnsimeClient.queue_poll, args.messages, args.interval))
+
+
+if __name__ == '__main__':
+    main()
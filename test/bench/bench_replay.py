@@ -0,0 +1,72 @@
+# coding: utf-8
+"""Replay recorded sessions through a client, timing its handling of them.
+
+Sessions are recorded with ``ENSIME_VIM_RECORD`` set, see ``:h ensime``.
+Without arguments, a session is recorded first against the fake server.
+Run from the repository root::
+
+    python -m test.bench.bench_replay [--realtime] [--repeat 10] [SESSION...]
+"""
+
+import argparse
+import os
+import time
+
+from ensime_shared.client import EnsimeClientV2
+from ensime_shared.recorder import replay, SessionRecorder
+from test.bench.bench_client import bench_completion, bench_quickfix, connect
+from test.bench.doubles import FakeLauncher, MemoryEditor
+from test.bench.fakeensime import FakeEnsimeServer, SOURCE
+
+
+def record_sample(directory, size=1000):
+    """Record a session of completions and usages against the fake server."""
+    server = FakeEnsimeServer(size=size).start()
+    client = connect(server, ['    val v{} = bench.me'.format(i) for i in range(100)])
+    client.recorder = SessionRecorder(os.path.join(directory, 'sample.jsonl.gz'))
+    try:
+        bench_completion(client, server, 10, 0.001)
+        bench_quickfix(lambda c: c.usages())(client, server, 10, 0.001)
+    finally:
+        client.teardown()
+        client.launcher.cleanup()
+        server.stop()
+    return client.recorder.path
+
+
+def run(path, realtime, repeat):
+    launcher = FakeLauncher()
+    client = EnsimeClientV2(MemoryEditor(SOURCE, ['']), launcher)
+    try:
+        started = time.time()
+        frames = sum(replay(client, path, realtime) for _ in range(repeat))
+        elapsed = time.time() - started
+    finally:
+        client.teardown()
+        launcher.cleanup()
+
+    print('{}: {} frames in {:.3f} s, {:.0f} frames/s'.format(
+        os.path.basename(path), frames, elapsed, frames / elapsed if elapsed else 0))
+    print('\n'.join(client.stats.report()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('sessions', nargs='*', metavar='SESSION')
+    parser.add_argument('--realtime', action='store_true',
+                        help='wait between frames as in the recorded session')
+    parser.add_argument('--repeat', type=int, default=1)
+    args = parser.parse_args()
+
+    sessions = args.sessions
+    if not sessions:
+        launcher = FakeLauncher()
+        sessions = [record_sample(launcher.config['root-dir'])]
+    for path in sessions:
+        run(path, args.realtime, args.repeat)
+    if not args.sessions:
+        launcher.cleanup()
+
+
+if __name__ == '__main__':
+    main()
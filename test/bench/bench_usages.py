@@ -0,0 +1,65 @@
+# coding: utf-8
+"""Benchmark of showing usages of a hot symbol in the quickfix list.
+
+Times how long the first page of usages takes to reach the editor, and all
+of them over the following ticks, against converting and sorting them all
+up front as was done before. Run from the repository root::
+
+    python -m test.bench.bench_usages --usages 100000
+"""
+
+import argparse
+import random
+import time
+from operator import itemgetter
+
+from ensime_shared.usages import USAGES_BATCH, USAGES_PAGE, Usages
+from test.bench.doubles import MemoryEditor
+
+
+def positions(count, files):
+    rng = random.Random(0)
+    return [{'position': {'file': '/project/src/Module{}.scala'.format(rng.randrange(files)),
+                          'line': rng.randrange(1, 3000)},
+             'preview': 'val x = symbol({})'.format(i)}
+            for i in range(count)]
+
+
+def bench_upfront(editor, usages):
+    started = time.time()
+    items = [editor.to_quickfix_item(str(p['position']['file']), p['position']['line'],
+                                     str(p['preview']), 'info')
+             for p in usages]
+    items.sort(key=itemgetter('filename', 'lnum'))
+    editor.write_quickfix_list(items, 'Usages')
+    elapsed = time.time() - started
+    return elapsed, elapsed, items
+
+
+def bench_streamed(editor, positions):
+    started = time.time()
+    usages = Usages('Usages', positions, editor.to_quickfix_item, limit=len(positions))
+    editor.write_quickfix_list(usages.take(USAGES_PAGE), usages.title)
+    first_page = time.time() - started
+    while usages.pending:
+        editor.append_quickfix_list(usages.take(USAGES_BATCH), usages.title)
+    return first_page, time.time() - started, editor.quickfix[-1][1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--usages', type=int, default=100000)
+    parser.add_argument('--files', type=int, default=2000)
+    args = parser.parse_args()
+
+    usages = positions(args.usages, args.files)
+    results = {}
+    for name, bench in [('up front', bench_upfront), ('streamed', bench_streamed)]:
+        first_page, total, results[name] = bench(MemoryEditor('A.scala', []), usages)
+        print('{:<9} first page {:>9.2f} ms, all {:>9.2f} ms'.format(
+            name, first_page * 1000, total * 1000))
+    assert results['up front'] == results['streamed']
+
+
+if __name__ == '__main__':
+    main()
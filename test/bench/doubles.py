@@ -0,0 +1,160 @@
+# coding: utf-8
+"""In-memory doubles of the editor and launcher, to run a real client headless."""
+
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+
+from ensime_shared.offsets import LineOffsets
+from ensime_shared.util import identifier_bounds
+
+
+class MemoryEditor(object):
+    """Stands in for :class:`ensime_shared.editor.Editor` over an in-memory buffer.
+
+    Only the operations used by the client are implemented. Instead of being
+    drawn, their effects are recorded:
+
+    Attributes:
+        quickfix (list): ``(title, items)`` of each quickfix list written,
+            with the items appended since.
+        notes (list): Notes of each call to ``display_notes``.
+        messages (list): Every message displayed, in order.
+    """
+
+    def __init__(self, path, lines):
+        self.lines = list(lines)
+        self._path = path
+        self._cursor = (1, 0)
+        self._offsets = LineOffsets()
+        self.changed = 1
+        self.modified = False
+
+        self.quickfix = []
+        self.notes = []
+        self.messages = []
+
+    def initialize(self):
+        pass
+
+    @contextmanager
+    def batch(self):
+        yield
+
+    def path(self):
+        return self._path
+
+    def cursor(self):
+        return self._cursor
+
+    def set_cursor(self, row, col):
+        self._cursor = (row, col)
+
+    def getline(self, lineno=None):
+        return self.lines[(lineno or self._cursor[0]) - 1]
+
+    def getlines(self):
+        return self.lines
+
+    def get_file_content(self):
+        return '\n'.join(self.lines)
+
+    def line_count(self):
+        return len(self.lines)
+
+    def changedtick(self):
+        return self.changed
+
+    def is_modified(self):
+        return self.modified
+
+    def edit_line(self, lineno, text):
+        """Change a line, as if typed by the user."""
+        self.lines[lineno - 1] = text
+        self.changed += 1
+        self.modified = True
+
+    def line_offsets(self):
+        self._offsets.update(self.lines, self.changed)
+        return self._offsets
+
+    def point2pos(self, point):
+        return self.line_offsets().position(point - 1)
+
+    def current_word(self):
+        line = self.getline()
+        begin, end = self.word_under_cursor_pos()
+        return line[begin[1]:end[1] + 1]
+
+    def word_under_cursor_pos(self):
+        row, col = self._cursor
+        begin, end = identifier_bounds(self.getline(), col)
+        return (row, begin), (row, end)
+
+    def selection_pos(self):
+        return self.word_under_cursor_pos()
+
+    def to_quickfix_item(self, file_name, line_number, message, tpe):
+        return {'filename': file_name, 'lnum': line_number, 'text': message, 'type': tpe}
+
+    def write_quickfix_list(self, qflist, title):
+        self.quickfix.append((title, qflist))
+
+    def append_quickfix_list(self, qflist, title):
+        self.quickfix[-1][1].extend(qflist)
+
+    def display_notes(self, notes):
+        self.notes.append(notes)
+
+    def clean_errors(self):
+        pass
+
+    def lazy_display_error(self, filename):
+        pass
+
+    def message(self, key):
+        self.messages.append(key)
+
+    def raw_message(self, message, silent=False):
+        self.messages.append(message)
+
+    def split_window(self, fpath, vertical=False, size=None, bufopts=None):
+        pass
+
+    def append(self, text, afterline=None):
+        pass
+
+
+class FakeProcess(object):
+    """An ENSIME server process that is always up, listening on ``port``."""
+
+    def __init__(self, port):
+        self.port = port
+
+    def is_ready(self):
+        return True
+
+    def http_port(self):
+        return self.port
+
+    def mark_connected(self, connected=True):
+        pass
+
+    def stop(self):
+        pass
+
+
+class FakeLauncher(object):
+    """Launcher of a throwaway project, with its cache dir in a temp dir."""
+
+    ensime_version = '2.0.0'
+
+    def __init__(self):
+        root = tempfile.mkdtemp(prefix='ensime-vim-bench')
+        self.config = {'name': 'bench',
+                       'root-dir': root,
+                       'cache-dir': os.path.join(root, '.ensime_cache')}
+
+    def cleanup(self):
+        shutil.rmtree(self.config['root-dir'], ignore_errors=True)
@@ -0,0 +1,175 @@
+# coding: utf-8
+"""A scriptable stand-in for an ENSIME server, speaking the v2 JSON protocol.
+
+Replies to requests are canned payloads generated per request ``typehint``,
+with a configurable number of entries and an artificial server-side delay.
+Events can be pushed at any time, e.g. to flood the client with typecheck
+notes.
+"""
+
+import json
+import threading
+import time
+
+from test.bench.fakeserver import FakeWebSocketServer
+
+SOURCE = '/tmp/bench/src/main/scala/bench/Bench.scala'
+
+
+def completions(size):
+    """``CompletionInfoList`` with ``size`` methods of one parameter each."""
+    def completion(i):
+        return {
+            'typehint': 'CompletionInfo',
+            'name': 'method{}'.format(i),
+            'relevance': 90 - i % 90,
+            'isInfix': False,
+            'typeInfo': {
+                'typehint': 'ArrowTypeInfo',
+                'name': '(x: Int)String',
+                'resultType': {'typehint': 'BasicTypeInfo', 'name': 'String',
+                               'fullName': 'java.lang.String', 'declAs': {'typehint': 'Class'}},
+                'paramSections': [{
+                    'isImplicit': False,
+                    'params': [['x', {'typehint': 'BasicTypeInfo', 'name': 'Int',
+                                      'fullName': 'scala.Int', 'declAs': {'typehint': 'Class'}}]],
+                }],
+            },
+        }
+
+    return {'typehint': 'CompletionInfoList', 'prefix': '',
+            'completions': [completion(i) for i in range(size)]}
+
+
+def source_positions(size, files=50):
+    """``SourcePositions`` with ``size`` usages spread over ``files`` files."""
+    def position(i):
+        path = '/tmp/bench/src/main/scala/bench/File{}.scala'.format(i % files)
+        return {
+            'typehint': 'PositionHint',
+            'position': {'typehint': 'LineSourcePosition', 'file': path, 'line': i // files + 1},
+            'preview': '    val x{} = bench.Bench.value'.format(i),
+        }
+
+    return {'typehint': 'SourcePositions', 'positions': [position(i) for i in range(size)]}
+
+
+def notes(size, path=SOURCE, offset=0):
+    """``NewScalaNotesEvent`` with ``size`` errors, one per line of ``path``."""
+    def note(i):
+        line = offset + i + 1
+        beg = line * 40
+        return {'typehint': 'Note', 'file': path, 'msg': 'type mismatch #{}'.format(line),
+                'severity': {'typehint': 'NoteError'},
+                'beg': beg, 'end': beg + 5, 'line': line, 'col': 1}
+
+    return {'typehint': 'NewScalaNotesEvent', 'isFull': False,
+            'notes': [note(i) for i in range(size)]}
+
+
+def symbol_search_results(size):
+    """``SymbolSearchResults`` with ``size`` types."""
+    def symbol(i):
+        return {'typehint': 'TypeSearchResult', 'name': 'bench.Type{}'.format(i),
+                'localName': 'Type{}'.format(i), 'declAs': {'typehint': 'Class'},
+                'pos': {'typehint': 'LineSourcePosition',
+                        'file': '/tmp/bench/src/main/scala/bench/Type{}.scala'.format(i),
+                        'line': 3}}
+
+    return {'typehint': 'SymbolSearchResults', 'syms': [symbol(i) for i in range(size)]}
+
+
+def connection_info(size):
+    return {'typehint': 'ConnectionInfo', 'pid': None,
+            'implementation': {'name': 'ENSIME'}, 'version': '2.0.0'}
+
+
+def void_response(size):
+    return {'typehint': 'VoidResponse'}
+
+
+RESPONDERS = {
+    'CompletionsReq': completions,
+    'UsesOfSymbolAtPointReq': source_positions,
+    'PublicSymbolSearchReq': symbol_search_results,
+    'ConnectionInfoReq': connection_info,
+    'TypecheckFilesReq': void_response,
+}
+"""Canned payload generator for each request ``typehint``."""
+
+
+class FakeEnsimeServer(object):
+    """Replies to ENSIME requests with canned payloads.
+
+    Args:
+        size (int): Number of entries in generated replies (completions,
+            usages, symbols...).
+        delay (float): Seconds the server "thinks" before each reply.
+        responders (dict): Overrides of :data:`RESPONDERS`, mapping a request
+            ``typehint`` to a function of ``size`` returning the payload.
+
+    Received requests are kept in ``requests``, in order.
+    """
+
+    def __init__(self, size=100, delay=0.0, responders=None):
+        self.size = size
+        self.delay = delay
+        self.responders = dict(RESPONDERS, **(responders or {}))
+        self.requests = []
+        self._cache = {}
+        self._server = FakeWebSocketServer(on_message=self._on_message)
+
+    @property
+    def url(self):
+        return self._server.url
+
+    @property
+    def port(self):
+        return self._server.port
+
+    def start(self):
+        self._server.start()
+        return self
+
+    def stop(self):
+        self._server.stop()
+
+    def push(self, payload, call_id=None):
+        """Send a payload to the client, as a reply or an event."""
+        self._server.send(json.dumps({'callId': call_id, 'payload': payload}))
+
+    def flood_notes(self, events, size, interval=0.0):
+        """Push ``events`` notes events of ``size`` notes then complete the typecheck.
+
+        Runs in the background, returns the thread doing it.
+        """
+        def flood():
+            for i in range(events):
+                self.push(notes(size, offset=i * size))
+                if interval:
+                    time.sleep(interval)
+            self.push({'typehint': 'FullTypeCheckCompleteEvent'})
+
+        thread = threading.Thread(name='fake-ensime-flood', target=flood)
+        thread.daemon = True
+        thread.start()
+        return thread
+
+    def _on_message(self, text):
+        message = json.loads(text)
+        request = message['req']
+        self.requests.append(request)
+
+        typehint = request['typehint']
+        responder = self.responders.get(typehint)
+        if not responder:
+            return
+
+        # Generating big payloads is not what's being measured
+        key = (typehint, self.size)
+        if key not in self._cache:
+            self._cache[key] = json.dumps(responder(self.size))
+        if self.delay:
+            time.sleep(self.delay)
+        self._server.send('{{"callId": {}, "payload": {}}}'.format(
+            message['callId'], self._cache[key]))
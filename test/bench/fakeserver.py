@@ -0,0 +1,143 @@
+# coding: utf-8
+"""A minimal in-process websocket server standing in for ENSIME in benchmarks.
+
+Only the subset of RFC 6455 needed by ``websocket-client`` is implemented:
+the opening handshake, unfragmented text frames and the close frame.
+"""
+
+import base64
+import hashlib
+import socket
+import struct
+import threading
+
+GUID = b'258EAFA5-E914-47DA-95CA-C5AB0DC85B11'
+
+OP_TEXT = 0x1
+OP_CLOSE = 0x8
+
+
+class FakeWebSocketServer(object):
+    """Serves a single websocket connection on a random local port.
+
+    Args:
+        on_connect (callable): Invoked on the server thread with the server
+            instance once a client has completed the handshake. Use it to
+            push frames with :meth:`send`.
+        on_message (callable): Invoked with each text frame received from the
+            client, decoded as ``str``.
+    """
+
+    def __init__(self, on_connect=None, on_message=None):
+        self.on_connect = on_connect
+        self.on_message = on_message
+        self._listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._listener.bind(('127.0.0.1', 0))
+        self._listener.listen(1)
+        self._conn = None
+        self._send_lock = threading.Lock()
+        self.port = self._listener.getsockname()[1]
+        self.connected = threading.Event()
+
+    @property
+    def url(self):
+        return 'ws://127.0.0.1:{}/websocket'.format(self.port)
+
+    def start(self):
+        thread = threading.Thread(name='fake-ws-server', target=self._serve)
+        thread.daemon = True
+        thread.start()
+        return self
+
+    def stop(self):
+        for sock in (self._conn, self._listener):
+            if sock:
+                try:
+                    sock.close()
+                except socket.error:
+                    pass
+
+    def send(self, text):
+        """Send a text frame to the connected client."""
+        payload = text.encode('utf-8')
+        size = len(payload)
+        if size < 126:
+            header = struct.pack('!BB', 0x80 | OP_TEXT, size)
+        elif size < (1 << 16):
+            header = struct.pack('!BBH', 0x80 | OP_TEXT, 126, size)
+        else:
+            header = struct.pack('!BBQ', 0x80 | OP_TEXT, 127, size)
+        with self._send_lock:
+            self._conn.sendall(header + payload)
+
+    def _serve(self):
+        try:
+            self._conn, _ = self._listener.accept()
+            self._conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self._handshake()
+        except socket.error:
+            return
+
+        self.connected.set()
+        if self.on_connect:
+            self.on_connect(self)
+
+        try:
+            while True:
+                opcode, payload = self._read_frame()
+                if opcode == OP_CLOSE:
+                    break
+                if opcode == OP_TEXT and self.on_message:
+                    self.on_message(payload.decode('utf-8'))
+        except (socket.error, EOFError):
+            pass
+
+    def _handshake(self):
+        request = b''
+        while b'\r\n\r\n' not in request:
+            chunk = self._conn.recv(4096)
+            if not chunk:
+                raise socket.error('connection closed during handshake')
+            request += chunk
+
+        headers = {}
+        for line in request.split(b'\r\n')[1:]:
+            if b':' in line:
+                key, value = line.split(b':', 1)
+                headers[key.strip().lower()] = value.strip()
+
+        accept = base64.b64encode(
+            hashlib.sha1(headers[b'sec-websocket-key'] + GUID).digest())
+        response = [b'HTTP/1.1 101 Switching Protocols',
+                    b'Upgrade: websocket',
+                    b'Connection: Upgrade',
+                    b'Sec-WebSocket-Accept: ' + accept]
+        if b'sec-websocket-protocol' in headers:
+            protocol = headers[b'sec-websocket-protocol'].split(b',')[0].strip()
+            response.append(b'Sec-WebSocket-Protocol: ' + protocol)
+        self._conn.sendall(b'\r\n'.join(response) + b'\r\n\r\n')
+
+    def _read_exactly(self, size):
+        data = b''
+        while len(data) < size:
+            chunk = self._conn.recv(size - len(data))
+            if not chunk:
+                raise EOFError()
+            data += chunk
+        return data
+
+    def _read_frame(self):
+        first, second = struct.unpack('!BB', self._read_exactly(2))
+        opcode = first & 0x0f
+        size = second & 0x7f
+        if size == 126:
+            size, = struct.unpack('!H', self._read_exactly(2))
+        elif size == 127:
+            size, = struct.unpack('!Q', self._read_exactly(8))
+        mask = self._read_exactly(4) if second & 0x80 else None
+        payload = bytearray(self._read_exactly(size))
+        if mask:
+            for i in range(size):
+                payload[i] ^= mask[i % 4]
+        return opcode, bytes(payload)
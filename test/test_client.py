@@ -0,0 +1,226 @@
+# coding: utf-8
+
+import json
+
+import mock
+import pytest
+
+from ensime_shared.client import EnsimeClientV2
+from ensime_shared.responses import Message
+
+
+@pytest.fixture
+def client(tmpdir):
+    config = {'name': tmpdir.basename,
+              'root-dir': str(tmpdir),
+              'cache-dir': str(tmpdir.join('.ensime_cache'))}
+    launcher = mock.Mock(name='launcher', config=config)
+    client = EnsimeClientV2(mock.Mock(name='editor'), launcher)
+    client.handle_incoming_response = mock.Mock(name='handle_incoming_response')
+    yield client
+    client.teardown()
+
+
+def event(n):
+    return Message(None, 'DebugOutputEvent', {'typehint': 'DebugOutputEvent', 'n': n})
+
+
+def reply(call_id):
+    return Message(call_id, 'SymbolInfo', {'typehint': 'SymbolInfo'})
+
+
+def handled(client):
+    return [c[0] for c in client.handle_incoming_response.call_args_list]
+
+
+class TestUnqueue:
+    def test_handles_replies_before_events(self, client):
+        for message in [event(1), event(2), reply(7), event(3)]:
+            client.queue.put(message)
+
+        assert not client.unqueue(budget=10)
+        assert handled(client) == [(7, reply(7).payload), (None, event(1).payload),
+                                   (None, event(2).payload), (None, event(3).payload)]
+
+    def test_carries_over_what_exceeds_budget(self, client):
+        for n in range(3):
+            client.queue.put(event(n))
+
+        assert client.unqueue(budget=0)
+        assert len(handled(client)) == 1
+
+        client.queue.put(reply(1))
+        assert client.unqueue(budget=0)
+        assert handled(client)[-1] == (1, reply(1).payload)
+
+        assert not client.unqueue(budget=10)
+        assert [p['n'] for _, p in handled(client) if p.get('n') is not None] == [0, 1, 2]
+
+
+class TestSymbolByName:
+    def test_opens_definition_on_tick(self, client):
+        del client.handle_incoming_response  # The real one
+        client.editor.batch = mock.MagicMock()
+        client.send = mock.Mock()
+        call_id = client.symbol_by_name(['org.example.Foo'])
+
+        client._receive(json.dumps({'callId': call_id, 'payload': {
+            'typehint': 'SymbolInfo',
+            'declPos': {'typehint': 'LineSourcePosition', 'file': 'Foo.scala', 'line': 3}}}))
+        client.unqueue(budget=10)
+
+        client.editor.split_window.assert_called_once_with('Foo.scala', vertical=True)
+        client.editor.set_cursor.assert_called_once_with(3, 0)
+
+    def test_reply_to_future_is_no_longer_in_flight(self, client):
+        client.send = mock.Mock()
+        future = client.symbol_by_name(['org.example.Foo'], future=True)
+        client._receive(json.dumps({'callId': future.call_id, 'payload': {
+            'typehint': 'SymbolInfo'}}))
+
+        assert future.done()
+        assert client.stats.to_dict()['in_flight'] == 0
+
+
+class TestCompleteFunc:
+    def test_narrows_truncated_reply_reused_for_longer_seed(self, client):
+        client.send = mock.Mock()
+        editor = client.editor
+        editor.path.return_value = 'A.scala'
+        editor.is_modified.return_value = False
+        editor.line_count.return_value = 1
+        editor.line_offsets.return_value.offset.return_value = 4
+
+        editor.getline.return_value, editor.cursor.return_value = 'x.fo', (1, 4)
+        client.complete_func(1, '')
+        future = client.completion_future
+        editor.getline.return_value, editor.cursor.return_value = 'x.foo', (1, 5)
+        assert client.complete_func(1, '') == 2
+        assert client.completion_future is future
+
+        def handle(call_id, payload):
+            client.suggestions = [{'word': w} for w in payload['words']]
+            client.suggestions_truncated = True
+        client.handle_incoming_response.side_effect = handle
+        client._receive(json.dumps({'callId': future.call_id, 'payload': {
+            'typehint': 'CompletionInfoList', 'words': ['foobar', 'fold', 'foo']}}))
+
+        suggestions = client.complete_func(0, 'foo')
+        assert [s['word'] for s in suggestions] == ['foo', 'foobar']
+
+
+class TestFileInfo:
+    def test_sends_path_of_saved_buffer(self, client):
+        client.editor.path.return_value = 'A.scala'
+        client.editor.is_modified.return_value = False
+        assert client._file_info() == {'file': 'A.scala'}
+        assert not client.editor.get_file_content.called
+
+    def test_inlines_modified_buffer_every_time(self, client):
+        client.editor.path.return_value = 'A.scala'
+        client.editor.is_modified.return_value = True
+        client.editor.get_file_content.return_value = 'object A'
+        for _ in range(2):
+            assert client._file_info() == {'file': 'A.scala', 'contents': 'object A'}
+
+
+class TestBusy:
+    def test_while_typechecking(self, client):
+        client.start_typechecking()
+        assert client.busy()
+
+    def test_not_after_typecheck_never_completed(self, client):
+        client.start_typechecking()
+        client.typecheck_started -= client.request_timeout + 1
+        assert client.currently_buffering_typechecks
+        assert not client.busy()
+
+    def test_forgets_expired_requests(self, client):
+        client.send = mock.Mock()
+        call_id = client.send_request({'typehint': 'SymbolAtPointReq'})
+        client.awaiting_reply[call_id] -= client.request_timeout + 1
+
+        assert not client.busy()
+        assert client.stats.to_dict()['in_flight'] == 0
+
+
+class TestDroppedNotes:
+    def test_reports_notes_dropped_once(self, client):
+        client.queue.max_notes = 2
+        for notes in (['a', 'b'], ['c', 'd', 'e']):
+            client.queue.put(Message(None, 'NewScalaNotesEvent',
+                                     {'typehint': 'NewScalaNotesEvent', 'notes': notes}))
+
+        client.unqueue(budget=10)
+        client.unqueue(budget=10)
+        client.editor.raw_message.assert_called_once_with(
+            'Too many typecheck notes, the oldest 3 were dropped')
+
+
+class TestUsages:
+    def positions(self, count):
+        return {'typehint': 'SourcePositions',
+                'positions': [{'position': {'file': 'A.scala', 'line': n}, 'preview': 'x'}
+                              for n in range(count, 0, -1)]}
+
+    def items(self, client, count):
+        return [client.editor.to_quickfix_item.return_value] * count
+
+    def test_shows_first_page_then_batches(self, client, monkeypatch):
+        monkeypatch.setattr('ensime_shared.protocol.USAGES_PAGE', 2)
+        monkeypatch.setattr('ensime_shared.client.USAGES_BATCH', 3)
+        client.call_options[1] = {'word_under_cursor': 'x'}
+        client.handle_source_positions(1, self.positions(6))
+
+        editor = client.editor
+        editor.write_quickfix_list.assert_called_once_with(self.items(client, 2), 'Usages of <x>')
+        assert [c[1][1] for c in editor.to_quickfix_item.mock_calls] == [1, 2]
+        assert client.has_backlog()
+
+        client.display_more_usages()
+        client.display_more_usages()
+        assert editor.append_quickfix_list.mock_calls == [
+            mock.call(self.items(client, 3), 'Usages of <x>'),
+            mock.call(self.items(client, 1), 'Usages of <x>'),
+        ]
+        assert not client.has_backlog()
+        assert not editor.raw_message.called
+
+    def test_stops_at_the_limit(self, client, monkeypatch):
+        monkeypatch.setattr('ensime_shared.usages.MAX_USAGES', 4)
+        monkeypatch.setattr('ensime_shared.protocol.USAGES_PAGE', 4)
+        client.call_options[1] = {'word_under_cursor': 'x'}
+        client.handle_source_positions(1, self.positions(6))
+
+        assert not client.has_backlog()
+        client.editor.raw_message.assert_called_once_with(
+            'Showing 4 of 6 usages, :EnUsagesMore to show more')
+
+        client.more_usages()
+        client.editor.append_quickfix_list.assert_called_once_with(
+            self.items(client, 2), 'Usages of <x>')
+
+
+class TestPackageInspector:
+    package_info = {
+        'typehint': 'PackageInfo', 'name': 'example', 'fullName': 'org.example',
+        'members': [{'typehint': 'BasicTypeInfo', 'name': 'Foo',
+                     'declAs': {'typehint': 'Class'},
+                     'members': [{'typehint': 'BasicTypeInfo', 'name': 'Bar',
+                                  'declAs': {'typehint': 'Object'}, 'members': []}]}]}
+
+    def test_renders_package_then_expands(self, client):
+        editor = client.editor
+        client.handle_package_info(None, self.package_info)
+        editor.replace_lines.assert_called_once_with(1, 1, ['org.example', '+ Class: Foo'])
+
+        editor.cursor.return_value = (2, 0)
+        client.toggle_inspector_node()
+        editor.replace_lines.assert_called_with(2, 2, ['- Class: Foo', '    Object: Bar'])
+
+    def test_opens_declaration_of_line(self, client):
+        client.handle_package_info(None, self.package_info)
+        client.editor.cursor.return_value = (2, 0)
+        client.symbol_by_name = mock.Mock(return_value=None)
+        client.open_decl_for_inspector_symbol()
+        client.symbol_by_name.assert_called_once_with(['org.example.Foo'], future=True)
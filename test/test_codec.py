@@ -0,0 +1,23 @@
+# coding: utf-8
+
+import pytest
+
+from ensime_shared.codec import CODECS, get_codec
+
+
+def test_defaults_to_fastest_codec():
+    assert get_codec() is list(CODECS.values())[0]
+    assert get_codec('json').name == 'json'
+
+
+def test_unknown_codec():
+    with pytest.raises(KeyError):
+        get_codec('yaml')
+
+
+@pytest.mark.parametrize('name', list(CODECS))
+def test_codecs_round_trip(name):
+    codec = get_codec(name)
+    message = {'callId': 3, 'payload': {'typehint': 'StringResponse', 'text': u'é'}}
+    assert codec.loads(codec.dumps(message)) == message
+    assert isinstance(codec.dumps(message), str)
@@ -0,0 +1,58 @@
+# coding: utf-8
+
+import pytest
+
+from ensime_shared.completion import CompletionCache
+
+KEY = ('/src/Foo.scala', 3, 10, '    list.', 42)
+
+
+def suggest(*words):
+    return [{'word': w, 'abbr': w, 'menu': 'Int', 'dup': 1} for w in words]
+
+
+@pytest.fixture
+def cache():
+    cache = CompletionCache(size=2)
+    cache.put(KEY, 'ma', suggest('mapValues', 'map', 'max', 'maxBy'), exhaustive=True)
+    return cache
+
+
+def words(suggestions):
+    return [s['word'] for s in suggestions]
+
+
+def test_misses_unknown_sites(cache):
+    assert cache.get(('/src/Bar.scala', 1, 1, '', 1), 'ma') is None
+
+
+def test_returns_same_seed_as_is(cache):
+    assert words(cache.get(KEY, 'ma')) == ['mapValues', 'map', 'max', 'maxBy']
+
+
+def test_narrows_longer_seed_exact_matches_first(cache):
+    assert words(cache.get(KEY, 'map')) == ['map', 'mapValues']
+    assert words(cache.get(KEY, 'maxB')) == ['maxBy']
+    assert cache.get(KEY, 'mapX') == []
+
+
+def test_misses_shorter_or_diverging_seed(cache):
+    assert cache.get(KEY, 'm') is None
+    assert cache.get(KEY, 'fo') is None
+
+
+def test_does_not_narrow_truncated_results(cache):
+    cache.put(KEY, 'ma', suggest('map', 'max'), exhaustive=False)
+    assert words(cache.get(KEY, 'ma')) == ['map', 'max']
+    assert cache.get(KEY, 'map') is None
+
+
+def test_evicts_least_recently_used(cache):
+    other, another = KEY[:-1] + (1,), KEY[:-1] + (2,)
+    cache.put(other, '', suggest('a'), exhaustive=True)
+    cache.get(KEY, 'ma')
+    cache.put(another, '', suggest('b'), exhaustive=True)
+
+    assert len(cache) == 2
+    assert cache.get(other, '') is None
+    assert cache.get(KEY, 'ma') is not None
@@ -4,7 +4,7 @@ import sexpdata
 from py import path
 from pytest import raises
 
-from ensime_shared.config import ProjectConfig
+from ensime_shared.config import FIND_TTL, ProjectConfig
 
 confpath = path.local(__file__).dirpath() / 'resources' / 'test.conf'
 config = ProjectConfig(confpath.strpath)
@@ -51,3 +51,42 @@ def test_finds_nearest_dot_ensime(tmpdir):
 
     project_file = subdir.ensure('app.scala')
     assert ProjectConfig.find_from(project_file.strpath) == dotensime
+
+
+def test_remembers_searches_for_a_while(tmpdir, monkeypatch):
+    now = [0]
+    monkeypatch.setattr(ProjectConfig, '_clock', staticmethod(lambda: now[0]))
+    subdir = tmpdir.ensure('src', dir=True)
+    assert ProjectConfig.find_from(subdir.strpath) is None
+
+    dotensime = tmpdir.ensure('.ensime')
+    assert ProjectConfig.find_from(subdir.strpath) == dotensime.realpath()
+
+    closer = subdir.ensure('.ensime')
+    assert ProjectConfig.find_from(subdir.strpath) == dotensime.realpath()
+    now[0] = FIND_TTL
+    assert ProjectConfig.find_from(subdir.strpath) == closer.realpath()
+
+    closer.remove()
+    dotensime.remove()
+    assert ProjectConfig.find_from(subdir.strpath) is None
+
+
+def test_parses_unchanged_config_once(tmpdir, monkeypatch):
+    dotensime = tmpdir.join('.ensime')
+    dotensime.write('(:name "cached")')
+    parse = ProjectConfig.parse
+    parsed = []
+
+    def counting_parse(path):
+        parsed.append(path)
+        return parse(path)
+
+    monkeypatch.setattr(ProjectConfig, 'parse', staticmethod(counting_parse))
+    assert ProjectConfig(dotensime.strpath)['name'] == 'cached'
+    assert ProjectConfig(dotensime.strpath)['name'] == 'cached'
+    assert len(parsed) == 1
+
+    dotensime.write('(:name "changed")')
+    assert ProjectConfig(dotensime.strpath)['name'] == 'changed'
+    assert len(parsed) == 2
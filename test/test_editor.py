@@ -4,6 +4,7 @@ import pytest
 from mock import call, sentinel
 
 from ensime_shared.editor import Editor
+from ensime_shared.errors import Error
 
 
 @pytest.fixture
@@ -26,11 +27,50 @@ def test_append(editor, vim):
     ]
 
 
+def test_replace_lines(editor, vim):
+    buffer = ['a', 'b', 'c', 'd']
+    vim.current.buffer = buffer
+    editor.replace_lines(2, 3, ['x'])
+    assert buffer == ['a', 'x', 'd']
+    editor.replace_lines(2, 2, ['y', 'z'])
+    assert buffer == ['a', 'y', 'z', 'd']
+
+
 def test_current_word(editor, vim):
     editor.current_word()
     vim.eval.assert_called_with('expand("<cword>")')
 
 
+@pytest.mark.parametrize('line, col, bounds', [
+    ('val foo = bar', 5, (4, 6)),
+    ('val foo = bar', 3, (4, 6)),
+    ('xs :: Nil', 3, (3, 4)),
+    ('def unary_! = x', 6, (4, 10)),
+    ('x.`type`.y', 3, (2, 7)),
+    ('$outer.b_=(1)', 7, (7, 9)),
+    ('42  ', 3, (3, 3)),
+])
+def test_word_under_cursor_pos(editor, vim, line, col, bounds):
+    vim.current.window.cursor = (2, col)
+    vim.current.line = line
+    beg, end = editor.word_under_cursor_pos()
+    assert (beg, end) == ((2, bounds[0]), (2, bounds[1]))
+    assert vim.current.window.cursor == (2, col)
+    assert not vim.command.called
+
+
+def test_word_under_cursor_pos_counts_bytes(editor, vim):
+    vim.current.line = u'val é = "日本" + foo'
+    # Cursor on "foo", past multibyte characters
+    vim.current.window.cursor = (1, len(u'val é = "日本" + '.encode('utf-8')))
+    beg, end = editor.word_under_cursor_pos()
+    start = len(u'val é = "日本" + '.encode('utf-8'))
+    assert (beg, end) == ((1, start), (1, start + 2))
+
+    vim.current.window.cursor = (1, 4)
+    assert editor.word_under_cursor_pos() == ((1, 4), (1, 4))
+
+
 def test_doautocmd(editor, vim):
     editor.doautocmd('BufLeave')
     editor.doautocmd('BufReadPre', 'BufRead', 'BufEnter')
@@ -54,6 +94,120 @@ def test_getlines(editor, vim):
     assert editor.getlines() == lines
 
 
+def test_is_modified(editor, vim):
+    vim.eval.return_value = '0'
+    assert not editor.is_modified()
+    vim.eval.return_value = '1'
+    assert editor.is_modified()
+    vim.eval.assert_called_with('&modified')
+
+
+class TestLazyDisplayError:
+    @pytest.fixture
+    def error(self, editor, mocker):
+        editor._errors.add(Error('/src/Foo.scala', 'type mismatch', 3, 4, 10))
+        mocker.patch.object(editor, 'path', return_value='/src/Foo.scala')
+        mocker.patch.object(editor, 'width', return_value=80)
+        mocker.patch.object(editor, 'raw_message')
+
+    def test_displays_error_under_cursor_once(self, editor, vim, error):
+        vim.current.window.cursor = (3, 5)
+        editor.lazy_display_error('/src/Foo.scala')
+        editor.lazy_display_error('/src/Foo.scala')
+        editor.raw_message.assert_called_once_with('type mismatch')
+
+    def test_looks_again_when_cursor_moves(self, editor, vim, error):
+        vim.current.window.cursor = (3, 5)
+        editor.lazy_display_error('/src/Foo.scala')
+        vim.current.window.cursor = (3, 6)
+        editor.lazy_display_error('/src/Foo.scala')
+        assert editor.raw_message.call_count == 2
+
+
+class TestDisplayNotes:
+    @staticmethod
+    def note(line, col, length, msg='error'):
+        return {'file': '/src/Foo.scala', 'msg': msg, 'line': line, 'col': col,
+                'beg': 100, 'end': 100 + length - 1,
+                'severity': {'typehint': 'NoteError'}}
+
+    @pytest.fixture
+    def editor(self, editor, vim, mocker):
+        mocker.patch.object(editor, 'path', return_value='/src/Foo.scala')
+        vim.eval.side_effect = lambda expr: (
+            '0' if expr == 'exists(":SyntasticCheck")'
+            else [str(i) for i in range(1, expr.count('matchadd') + 1)])
+        return editor
+
+    def test_adds_matches_in_one_call(self, editor, vim):
+        editor.display_notes([self.note(3, 5, 2), self.note(7, 1, 4)])
+
+        adds = [c for c in vim.eval.call_args_list if 'matchadd' in c[0][0]]
+        assert len(adds) == 1
+        assert adds[0][0][0].count('matchadd') == 2
+        assert not vim.command.called
+        assert editor.get_error_at((7, 2)).message == 'error'
+
+    def test_only_touches_changed_notes(self, editor, vim):
+        editor.display_notes([self.note(3, 5, 2), self.note(7, 1, 4)])
+        vim.reset_mock()
+
+        editor.display_notes([self.note(7, 1, 4), self.note(9, 1, 1)])
+
+        vim.command.assert_called_once_with('silent! call matchdelete(1)')
+        adds = [c[0][0] for c in vim.eval.call_args_list if 'matchadd' in c[0][0]]
+        assert len(adds) == 1
+        assert adds[0].count('matchadd') == 1
+        assert r'\%9l' in adds[0]
+        assert editor.get_error_at((3, 5)) is None
+
+
+class FakeBuffer(object):
+    """Answers the expression of ``Editor.line_offsets()`` like Vim would."""
+
+    def __init__(self, lines):
+        self.lines = list(lines)
+        self.changedtick = 1
+
+    def eval(self, expr):
+        result = ['1', str(self.changedtick)]  # Numbers come back as strings
+        if "'1': {}}}".format(self.changedtick) not in expr:
+            result.append(list(self.lines))
+        return result
+
+
+class TestLineOffsets:
+    lines = ['package foo', '', 'object Bar']
+
+    @pytest.fixture
+    def buffer(self, vim):
+        buffer = FakeBuffer(self.lines)
+        vim.eval.side_effect = buffer.eval
+        return buffer
+
+    def test_point2pos(self, editor, buffer):
+        assert editor.point2pos(1) == (1, 0)
+        assert editor.point2pos(14) == (3, 0)
+        assert editor.point2pos(17) == (3, 3)
+
+    def test_reuses_index_until_buffer_changes(self, editor, vim, buffer):
+        offsets = editor.line_offsets()
+        assert offsets.offset(3, 0) == 13
+
+        buffer.lines[0] = 'package foobar'
+        assert editor.line_offsets().offset(3, 0) == 13
+
+        buffer.changedtick = 2
+        assert editor.line_offsets().offset(3, 0) == 16
+
+    def test_makes_one_call_per_lookup(self, editor, vim, buffer):
+        editor.point2pos(1)
+        buffer.changedtick = 2
+        editor.point2pos(1)
+        assert [name for name, _, _ in vim.mock_calls] == ['eval', 'eval']
+        assert "{'1': 1}" in vim.eval.call_args[0][0]
+
+
 class TestMenu:
     prompt = 'Choose one:'
     choices = ['one', 'two', 'three']
@@ -129,3 +283,97 @@ def test_write(editor, vim):
         call.command('write'),
         call.command('noautocmd write'),
     ]
+
+
+class TestBatch:
+    def test_runs_commands_in_one_call_on_neovim(self, editor, vim):
+        editor._isneovim = True
+        vim.api.call_atomic.return_value = [[None, None], None]
+        with editor.batch():
+            editor.edit('foo.scala')
+            editor.set_cursor(3, 4)
+            assert not vim.mock_calls
+
+        assert vim.mock_calls == [call.api.call_atomic([
+            ['nvim_command', ['edit foo.scala']],
+            ['nvim_command', ['call cursor(3, 5)']],
+        ])]
+
+    def test_raises_errors_of_neovim(self, editor, vim):
+        editor._isneovim = True
+        vim.error = RuntimeError
+        vim.api.call_atomic.return_value = [[], [0, 0, 'E37: No write since last change']]
+        with pytest.raises(RuntimeError) as excinfo:
+            with editor.batch():
+                editor.edit('foo.scala')
+                editor.doautocmd('BufEnter')
+        assert 'edit foo.scala: E37' in str(excinfo.value)
+
+    def test_runs_commands_in_one_execute_on_vim(self, editor, vim):
+        vim.eval.side_effect = lambda expr: 1 if expr == "exists('*execute')" else None
+        with editor.batch():
+            editor.edit("it's.scala")
+            editor.doautocmd('BufEnter')
+
+        assert vim.mock_calls == [
+            call.eval("exists('*execute')"),
+            call.eval("execute(['edit it''s.scala', 'doautocmd BufEnter'])"),
+        ]
+
+    def test_empty_batch_makes_no_call(self, editor, vim):
+        editor._isneovim = True
+        with editor.batch():
+            pass
+        assert not vim.mock_calls
+
+    def test_runs_deferred_commands_before_anything_else(self, editor, vim):
+        with editor.batch():
+            editor.edit('foo.scala')
+            with editor.batch():
+                vim.eval.side_effect = lambda expr: 2
+                assert editor.changedtick() == 2
+                editor.doautocmd('BufEnter')
+
+        assert vim.mock_calls == [
+            call.command('edit foo.scala'),
+            call.eval('b:changedtick'),
+            call.command('doautocmd BufEnter'),
+        ]
+
+
+class TestWriteQuickfixList:
+    items = [{'filename': 'A.scala', 'lnum': n, 'text': "it's", 'type': 'n'} for n in range(5)]
+
+    def test_passes_items_to_neovim(self, editor, vim):
+        editor._isneovim = True
+        editor.write_quickfix_list(self.items, 'Usages')
+        assert vim.mock_calls == [
+            call.call('setqflist', self.items, 'r', 'Ensime - Usages'),
+            call.command('copen'),
+        ]
+
+    def test_passes_items_to_vim(self, editor, vim):
+        editor.write_quickfix_list(self.items, "Usages of <it's>")
+        assert vim.mock_calls == [
+            call.Function('setqflist'),
+            call.Function()(self.items, 'r'),
+            call.command('copen'),
+            call.command("let w:quickfix_title='Ensime - Usages of <it''s>'"),
+        ]
+
+    def test_opens_window_after_first_chunk(self, editor, vim, monkeypatch):
+        monkeypatch.setattr('ensime_shared.editor.QUICKFIX_CHUNK_SIZE', 2)
+        editor._isneovim = True
+        editor.write_quickfix_list(self.items, 'Usages')
+        assert vim.mock_calls == [
+            call.call('setqflist', self.items[:2], 'r', 'Ensime - Usages'),
+            call.command('copen'),
+            call.command('redraw'),
+            call.call('setqflist', self.items[2:4], 'a', 'Ensime - Usages'),
+            call.call('setqflist', self.items[4:], 'a', 'Ensime - Usages'),
+        ]
+
+    def test_empties_list(self, editor, vim):
+        editor._isneovim = True
+        editor.write_quickfix_list([], 'Usages')
+        assert vim.mock_calls[0] == call.call('setqflist', [], 'r', 'Ensime - Usages')
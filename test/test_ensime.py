@@ -0,0 +1,85 @@
+# coding: utf-8
+
+import mock
+import pytest
+
+from ensime_shared.config import FIND_TTL, ProjectConfig
+from ensime_shared.ensime import Ensime
+
+
+@pytest.fixture
+def ensime(vim, tmpdir):
+    vim.current.buffer.number = 1
+    vim.current.buffer.name = tmpdir.ensure('src', 'A.scala').strpath
+    dotensime = tmpdir.ensure('.ensime').realpath()
+
+    ensime = Ensime(vim)
+    ensime._ticker = mock.Mock(name='ticker')
+    ensime.create_client = mock.Mock(**{'return_value.setup.return_value': True})
+    ensime.dotensime = dotensime
+    return ensime
+
+
+def current_client(ensime):
+    return ensime.current_client(quiet=True, bootstrap_server=False, create_client=True)
+
+
+def test_remembers_client_of_buffer(ensime, monkeypatch):
+    client = current_client(ensime)
+    assert ensime.clients == {ensime.dotensime: client}
+
+    find_from = mock.Mock()
+    monkeypatch.setattr(ProjectConfig, 'find_from', find_from)
+    assert current_client(ensime) is client
+    assert not find_from.called
+
+
+def test_looks_up_renamed_buffer_again(ensime, vim, tmpdir):
+    client = current_client(ensime)
+    vim.current.buffer.name = tmpdir.ensure('src', 'B.scala').strpath
+    assert current_client(ensime) is client
+    assert ensime._buffer_clients[1][:3] == (vim.current.buffer.name, ensime.dotensime, client)
+
+
+def test_does_not_remember_failed_clients(ensime):
+    ensime.create_client.return_value.setup.return_value = False
+    current_client(ensime)
+    current_client(ensime)
+    assert ensime.create_client.call_count == 2
+    assert not ensime._buffer_clients
+    assert not ensime._ticker.watch.called
+
+
+def test_watches_clients_set_up(ensime):
+    client = current_client(ensime)
+    ensime._ticker.watch.assert_called_once_with(client)
+
+
+def test_finds_project_created_later(ensime, vim, tmpdir):
+    ensime.dotensime.remove()
+    assert current_client(ensime) is None
+
+    tmpdir.ensure('.ensime')
+    assert current_client(ensime) is ensime.create_client.return_value
+
+
+def test_looks_up_again_when_config_is_gone(ensime, vim, tmpdir):
+    current_client(ensime)
+    ensime.dotensime.remove()
+    assert current_client(ensime) is None
+    assert not ensime._buffer_clients
+
+
+def test_finds_nearer_project_after_ttl(ensime, vim, tmpdir, monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(ProjectConfig, '_clock', staticmethod(lambda: now[0]))
+    monkeypatch.setattr(ProjectConfig, '_found', {})
+    current_client(ensime)
+
+    nearer = tmpdir.ensure('src', '.ensime').realpath()
+    assert current_client(ensime) is ensime.create_client.return_value
+    assert ensime.create_client.call_count == 1
+
+    now[0] += FIND_TTL
+    current_client(ensime)
+    assert ensime.create_client.call_args == mock.call(nearer)
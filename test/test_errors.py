@@ -0,0 +1,28 @@
+# coding: utf-8
+
+import os
+
+from ensime_shared.errors import Error, ErrorIndex
+
+PATH = os.path.abspath('Foo.scala')
+
+
+def test_finds_error_spanning_cursor():
+    index = ErrorIndex()
+    first = Error(PATH, 'type mismatch', 3, 4, 10)
+    second = Error(PATH, 'not found: value x', 3, 12, 13)
+    index.add(first)
+    index.add(second)
+    index.add(Error(PATH, 'unused import', 1, 0, 20))
+
+    assert len(index) == 3
+    assert index.at(PATH, (3, 4)) is first
+    assert index.at(PATH, (3, 12)) is second
+    assert index.at(PATH, (3, 10)) is None
+    assert index.at(PATH, (2, 4)) is None
+
+
+def test_only_finds_errors_of_given_file():
+    index = ErrorIndex()
+    index.add(Error(PATH, 'type mismatch', 3, 4, 10))
+    assert index.at(os.path.abspath('Bar.scala'), (3, 5)) is None
@@ -0,0 +1,60 @@
+# coding: utf-8
+
+import pytest
+
+from ensime_shared.inspector import PackageTree
+
+
+def member(name, kind='Class', members=()):
+    return {'typehint': 'BasicTypeInfo', 'name': name,
+            'declAs': {'typehint': kind}, 'members': list(members)}
+
+
+@pytest.fixture
+def tree():
+    return PackageTree({
+        'typehint': 'PackageInfo', 'name': 'example', 'fullName': 'org.example',
+        'members': [
+            member('Foo', members=[member('Inner', 'Trait', [member('Deep')])]),
+            member('Bar', 'Object'),
+            {'typehint': 'PackageInfo', 'name': 'sub', 'fullName': 'org.example.sub',
+             'members': [member('Baz')]},
+        ]})
+
+
+def test_shows_members_of_package(tree):
+    assert tree.lines() == [
+        'org.example',
+        '+ Class: Foo',
+        '  Object: Bar',
+        '+ : sub',
+    ]
+
+
+def test_finds_node_by_line(tree):
+    assert tree.node_at(1).fqn == 'org.example'
+    assert tree.node_at(3).fqn == 'org.example.Bar'
+    assert tree.node_at(4).fqn == 'org.example.sub'
+    assert tree.node_at(0) is None
+    assert tree.node_at(5) is None
+
+
+def test_expands_and_collapses(tree):
+    assert tree.toggle(2) == (2, 2, ['- Class: Foo', '  + Trait: Inner'])
+    assert tree.toggle(3) == (3, 3, ['  - Trait: Inner', '      Class: Deep'])
+    assert tree.node_at(4).fqn == 'org.example.Foo.Inner.Deep'
+    assert tree.node_at(5).fqn == 'org.example.Bar'
+
+    assert tree.toggle(2) == (2, 4, ['+ Class: Foo'])
+    assert len(tree) == 4
+    assert tree.node_at(3).fqn == 'org.example.Bar'
+
+    # Inner stays expanded
+    assert tree.toggle(2) == (2, 2, ['- Class: Foo', '  - Trait: Inner', '      Class: Deep'])
+
+
+def test_toggles_only_nodes_with_members(tree):
+    assert tree.toggle(1) is None
+    assert tree.toggle(3) is None
+    assert tree.toggle(9) is None
+    assert len(tree) == 4
@@ -0,0 +1,80 @@
+# coding: utf-8
+
+from ensime_shared.lanes import LaneQueue
+from ensime_shared.responses import Message
+
+
+def event(typehint, **payload):
+    return Message(None, typehint, dict(payload, typehint=typehint))
+
+
+def notes(*notes, **kwargs):
+    return event('NewScalaNotesEvent', notes=list(notes), isFull=kwargs.get('full', False))
+
+
+def drain(queue):
+    messages = []
+    while not queue.empty():
+        messages.append(queue.get())
+    return messages
+
+
+def test_hands_out_messages_by_priority():
+    queue = LaneQueue()
+    reply = Message(3, 'SymbolInfo', {'typehint': 'SymbolInfo'})
+    debug = event('DebugOutputEvent', body='out')
+    indexer = event('IndexerReadyEvent')
+    for message in [notes('a'), indexer, debug, reply]:
+        queue.put(message)
+
+    assert len(queue) == 4
+    assert drain(queue) == [reply, debug, notes('a'), indexer]
+    assert queue.get() is None
+
+
+def test_coalesces_consecutive_notes_events():
+    queue = LaneQueue()
+    first = notes('a')
+    for message in [first, notes('b'), notes('c')]:
+        queue.put(message)
+    queue.put(event('FullTypeCheckCompleteEvent'))
+    queue.put(notes('d'))
+
+    merged, complete, last = drain(queue)
+    assert merged.payload['notes'] == ['a', 'b', 'c']
+    assert complete.typehint == 'FullTypeCheckCompleteEvent'
+    assert last.payload['notes'] == ['d']
+    assert first.payload['notes'] == ['a']
+
+
+def test_full_notes_replace_previous_ones():
+    queue = LaneQueue()
+    for message in [notes('a'), notes('b'), notes('c', full=True), notes('d')]:
+        queue.put(message)
+
+    merged, = drain(queue)
+    assert merged.payload['notes'] == ['c', 'd']
+    assert merged.payload['isFull']
+
+
+def test_drops_repeated_events():
+    queue = LaneQueue()
+    queue.put(event('IndexerReadyEvent'))
+    queue.put(event('IndexerReadyEvent'))
+
+    assert len(drain(queue)) == 1
+
+
+def test_drops_oldest_notes_past_capacity():
+    queue = LaneQueue(max_notes=3)
+    queue.put(notes('a', 'b'))
+    queue.put(event('FullTypeCheckCompleteEvent'))
+    queue.put(notes('c', 'd', 'e'))
+
+    first, complete, second = drain(queue)
+    assert first.payload['notes'] == []
+    assert second.payload['notes'] == ['c', 'd', 'e']
+    assert queue.dropped_notes == 2
+
+    queue.put(notes('f'))
+    assert queue.dropped_notes == 2
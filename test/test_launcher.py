@@ -1,5 +1,8 @@
 # coding: utf-8
 
+import os
+import socket
+
 import pytest
 from mock import patch
 from py import path
@@ -7,7 +10,7 @@ from py import path
 from ensime_shared.config import ProjectConfig
 from ensime_shared.errors import LaunchError
 from ensime_shared.launcher import (AssemblyJar, DotEnsimeLauncher,
-                                    EnsimeLauncher, SbtBootstrap)
+                                    EnsimeLauncher, EnsimeProcess, SbtBootstrap)
 
 CONFROOT = path.local(__file__).dirpath() / 'resources'
 
@@ -117,6 +120,60 @@ class TestSbtBootstrapStrategy:
         assert 'Bootstrap classpath file does not exist' in str(excinfo.value)
 
 
+class TestEnsimeProcess:
+    @pytest.fixture
+    def server(self):
+        server = socket.socket()
+        server.bind(('127.0.0.1', 0))
+        server.listen(1)
+        yield server
+        server.close()
+
+    @pytest.fixture
+    def clock(self):
+        return [100.0]
+
+    @pytest.fixture
+    def process(self, tmpdir, clock):
+        return EnsimeProcess(tmpdir.strpath, None, None, lambda: None, clock=lambda: clock[0])
+
+    def test_ready_once_port_accepts_connections(self, process, server, tmpdir, clock):
+        assert not process.is_ready()
+        assert process.state == EnsimeProcess.STARTING
+
+        tmpdir.join('http').write(str(server.getsockname()[1]))
+        assert not process.is_ready(), 'probed again before backoff'
+
+        clock[0] += 1
+        assert process.is_ready()
+        assert process.state == EnsimeProcess.READY
+
+    def test_caches_port_until_file_changes(self, process, tmpdir):
+        portfile = tmpdir.join('http')
+        portfile.write('1234')
+        assert process.http_port() == 1234
+
+        with patch('ensime_shared.launcher.Util.read_file') as read_file:
+            assert process.http_port() == 1234
+            assert not read_file.called
+
+        portfile.write('4321')
+        os.utime(portfile.strpath, (0, 0))
+        assert process.http_port() == 4321
+
+    def test_connected_answers_from_memory(self, process, tmpdir):
+        tmpdir.join('http').write('1234')
+        process.http_port()
+        process.mark_connected()
+        tmpdir.join('http').remove()
+
+        assert process.is_ready()
+        assert process.http_port() == 1234
+
+        process.mark_connected(False)
+        assert process.state == EnsimeProcess.READY
+
+
 # -----------------------------------------------------------------------
 # -                               Helpers                               -
 # -----------------------------------------------------------------------
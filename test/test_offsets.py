@@ -0,0 +1,51 @@
+# coding: utf-8
+
+import pytest
+
+from ensime_shared.offsets import LineOffsets
+
+LINES = ['package foo', '', 'object Bar {', '  val x = 1', '}']
+
+
+@pytest.fixture
+def offsets():
+    return LineOffsets(LINES, changedtick=1)
+
+
+def naive_offset(lines, row, col):
+    return col + sum(len(line) + 1 for line in lines[:row - 1])
+
+
+def test_offset_matches_summing_lines(offsets):
+    for row in range(1, len(LINES) + 1):
+        for col in range(len(LINES[row - 1]) + 1):
+            assert offsets.offset(row, col) == naive_offset(LINES, row, col)
+
+
+def test_position_inverts_offset(offsets):
+    for row in range(1, len(LINES) + 1):
+        for col in range(len(LINES[row - 1]) + 1):
+            assert offsets.position(offsets.offset(row, col)) == (row, col)
+
+
+def test_position_past_end_is_on_last_line(offsets):
+    total = sum(len(line) + 1 for line in LINES)
+    assert offsets.position(total + 10)[0] == len(LINES)
+
+
+def test_update_recomputes_from_changed_line(offsets):
+    lines = LINES[:]
+    lines[2] = 'object Baz extends App {'
+    lines.insert(3, '  // new line')
+    offsets.update(lines, changedtick=2)
+
+    assert offsets.changedtick == 2
+    assert len(offsets) == len(lines)
+    for row in range(1, len(lines) + 1):
+        assert offsets.offset(row, 0) == naive_offset(lines, row, 0)
+
+
+def test_update_shrinking_buffer(offsets):
+    offsets.update(LINES[:2], changedtick=2)
+    assert len(offsets) == 2
+    assert offsets.position(offsets.offset(2, 0)) == (2, 0)
@@ -0,0 +1,63 @@
+# coding: utf-8
+
+from collections import defaultdict
+
+from ensime_shared.recorder import read_session, RECEIVED, replay, SENT, SessionRecorder
+
+
+class FakeClock(object):
+    def __init__(self):
+        self.now = 10.0
+
+    def __call__(self):
+        return self.now
+
+
+class ReplayClient(object):
+    def __init__(self):
+        self.call_options = {}
+        self.dispatched = []
+
+    def decode_frame(self, frame):
+        return frame
+
+    def _dispatch(self, message):
+        self.dispatched.append(message)
+
+
+def record(path):
+    clock = FakeClock()
+    recorder = SessionRecorder(str(path), clock=clock)
+    recorder.sent('{"callId": 1}')
+    clock.now += 0.5
+    recorder.received(u'{"callId": 1, "payload": "é"}')
+    recorder.close()
+    recorder.received('{"late": true}')
+    return str(path)
+
+
+def test_read_session(tmpdir):
+    path = record(tmpdir.join('session.jsonl.gz'))
+
+    assert list(read_session(path)) == [
+        (0, SENT, '{"callId": 1}'),
+        (0.5, RECEIVED, u'{"callId": 1, "payload": "é"}'),
+    ]
+
+
+def test_replay_received_frames(tmpdir):
+    path = record(tmpdir.join('session.jsonl.gz'))
+    client = ReplayClient()
+    naps = []
+
+    assert replay(client, path, realtime=True, sleep=naps.append) == 1
+    assert client.dispatched == [u'{"callId": 1, "payload": "é"}']
+    assert len(naps) == 1 and 0 < naps[0] <= 0.5
+    assert isinstance(client.call_options, defaultdict)
+
+
+def test_in_dir(tmpdir):
+    recorder = SessionRecorder.in_dir(str(tmpdir))
+    recorder.close()
+
+    assert recorder.path.startswith(str(tmpdir.join('ensime-vim-session-')))
@@ -0,0 +1,29 @@
+# coding: utf-8
+
+import threading
+
+from ensime_shared.responses import peek_call_id, ResponseFuture
+
+
+def test_peeks_call_id():
+    assert peek_call_id('{"callId": 42, "payload": {"typehint": "SymbolInfo"}}') == 42
+    assert peek_call_id('{"payload": {"typehint": "X"}, "callId":7}') == 7
+
+
+def test_peeks_events_without_call_id():
+    frame = '{"payload": {"typehint": "NewScalaNotesEvent", "msg": "\\"callId\\": 3"}}'
+    assert peek_call_id(frame) is None
+
+
+class TestResponseFuture:
+    def test_times_out_without_result(self):
+        future = ResponseFuture(1)
+        assert not future.done()
+        assert future.result(timeout=0.01) is None
+
+    def test_wakes_up_waiter_on_result(self):
+        future = ResponseFuture(1)
+        timer = threading.Timer(0.01, future.set_result, ['frame'])
+        timer.start()
+        assert future.result(timeout=5) == 'frame'
+        assert future.done()
@@ -0,0 +1,56 @@
+# coding: utf-8
+
+import pytest
+from py import path
+
+from ensime_shared import sexp
+from ensime_shared.config import ProjectConfig
+
+RESOURCES = path.local(__file__).dirpath() / 'resources'
+
+
+@pytest.mark.parametrize('conffile', ['test.conf', 'test-bootstrap.conf', 'test-server-jars.conf'])
+def test_parses_like_sexpdata(conffile):
+    text = RESOURCES.join(conffile).read()
+    assert sexp.loads_config(text) == ProjectConfig.parse_sexpdata(text)
+
+
+@pytest.mark.parametrize('text', [
+    '()',
+    '(:a nil :b t :c 1 :d -1.5 :e 1e3 :f "" :g ())',
+    '(:list ("a" 1 nil t ("b" (2))) :odd)',
+    '(:nested (:name "x" :inner (:deeper ("y"))))',
+    '(:subprojects ((:name "a" :deps ("x" "y")) () (:name "b")))',
+    '(key "no colon" "string key" 1 2 "two")',
+    '(\t:unicode\n  "é中"\r\n)',
+    '\n(:a 1\n\n :b 2)\n\n',
+])
+def test_supported_subset(text):
+    assert sexp.loads_config(text) == ProjectConfig.parse_sexpdata(text)
+
+
+@pytest.mark.parametrize('text', [
+    '',
+    '"not a list"',
+    '(:a 1) (:b 2)',
+    '(:a symbol)',
+    '(:a ("x" symbol))',
+    '(:a (nil (:b 1)))',
+    '(:a ((:b 1) "c"))',
+    '(:a "escaped \\" quote")',
+    "(:a 'quoted)",
+    '(:a [1 2])',
+    '(:a 1 ; comment\n)',
+    '(:a (:b 1)',
+])
+def test_rejects_anything_else(text):
+    with pytest.raises(sexp.UnsupportedSyntax):
+        sexp.loads_config(text)
+
+
+def test_falls_back_to_sexpdata(tmpdir):
+    conf = tmpdir.join('.ensime')
+    conf.write('(:name "escaped \\"name\\"" :flags ("-Xmx2g") :mode fast)')
+    config = ProjectConfig(conf.strpath)
+    assert config['name'] == 'escaped "name"'
+    assert config['flags'] == ['-Xmx2g']
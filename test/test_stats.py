@@ -0,0 +1,73 @@
+# coding: utf-8
+
+from ensime_shared.stats import Histogram, Stats
+
+
+class FakeClock(object):
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_histogram_percentiles():
+    h = Histogram()
+    for ms in [1] * 98 + [40, 3000]:
+        h.add(ms / 1000.0)
+
+    assert h.count == 100
+    assert h.percentile(50) == 1
+    assert h.percentile(99) == 50
+    assert h.percentile(100) == 3000
+    assert h.to_dict()['buckets_ms']['5000'] == 1
+
+
+def test_empty_histogram():
+    assert Histogram().percentile(99) == 0
+    assert Histogram().to_dict()['mean_ms'] == 0
+
+
+def test_request_latency():
+    clock = FakeClock()
+    stats = Stats(clock=clock)
+    stats.request_sent(1, 'CompletionsReq')
+    clock.now += 0.15
+    stats.response_decoded('CompletionInfoList', 0.001)
+    stats.response_handled(1, 'CompletionInfoList', 0.002)
+
+    latency = stats.latency['CompletionsReq']
+    assert latency.count == 1
+    assert abs(latency.max_ms - 150) < 1e-6
+    assert stats.to_dict()['in_flight'] == 0
+
+
+def test_dropped_requests_have_no_latency():
+    stats = Stats(clock=FakeClock())
+    stats.request_sent(1, 'CompletionsReq')
+    stats.request_dropped(1)
+    stats.response_handled(1, 'CompletionInfoList', 0.002)
+
+    assert 'CompletionsReq' not in stats.latency
+    assert stats.sent == {'CompletionsReq': 1}
+
+
+def test_replies_to_futures_have_latency_on_receipt():
+    clock = FakeClock()
+    stats = Stats(clock=clock)
+    stats.request_sent(1, 'SymbolByNameReq')
+    clock.now += 0.05
+    stats.response_received(1)
+
+    assert abs(stats.latency['SymbolByNameReq'].max_ms - 50) < 1e-6
+    assert stats.to_dict()['in_flight'] == 0
+
+
+def test_report_lists_requests_and_responses():
+    stats = Stats(clock=FakeClock())
+    stats.request_sent(1, 'TypecheckFileReq')
+    stats.response_handled(None, 'NewScalaNotesEvent', 0.01)
+
+    report = '\n'.join(stats.report())
+    assert 'TypecheckFileReq' in report
+    assert 'NewScalaNotesEvent handler' in report
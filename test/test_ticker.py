@@ -0,0 +1,132 @@
+# coding: utf-8
+
+import threading
+
+import mock
+import pytest
+
+from ensime_shared.client import EnsimeClientV2
+from ensime_shared.ticker import BUSY_INTERVAL, IDLE_INTERVAL, Ticker
+
+
+def fake_vim(nvim):
+    timers = iter(range(1, 100))
+
+    def vimeval(expr):
+        if expr == "has('nvim')":
+            return int(nvim)
+        if expr == "has('timers')":
+            return 1
+        if expr.startswith('timer_start'):
+            return next(timers)
+        return mock.DEFAULT
+
+    return mock.NonCallableMock(name='mockvim', **{'eval.side_effect': vimeval})
+
+
+def timer_starts(vim):
+    return [c[1][0] for c in vim.eval.mock_calls if c[1][0].startswith('timer_start')]
+
+
+def client(busy=False, queued=False):
+    return mock.Mock(**{'busy.return_value': busy, 'has_backlog.return_value': queued,
+                        'usages_pending.return_value': False})
+
+
+class TestVim:
+    @pytest.fixture
+    def vim(self):
+        return fake_vim(nvim=False)
+
+    def test_starts_idle(self, vim):
+        Ticker(vim, mock.Mock())
+        assert timer_starts(vim) == ["timer_start({}, 'EnTick', {{'repeat': -1}})"
+                                     .format(IDLE_INTERVAL)]
+
+    def test_speeds_up_while_busy(self, vim):
+        ticker = Ticker(vim, mock.Mock())
+        ticker.ticked([client(busy=True), client()])
+        ticker.ticked([client(busy=True)])
+        ticker.ticked([client()])
+
+        intervals = [IDLE_INTERVAL, BUSY_INTERVAL, IDLE_INTERVAL]
+        assert timer_starts(vim) == ["timer_start({}, 'EnTick', {{'repeat': -1}})".format(i)
+                                     for i in intervals]
+        assert vim.command.mock_calls == [mock.call('call timer_stop(1)'),
+                                          mock.call('call timer_stop(2)')]
+
+    def test_wakes_up_on_main_thread_only(self, vim):
+        ticker = Ticker(vim, mock.Mock())
+        thread = threading.Thread(target=ticker.wake)
+        thread.start()
+        thread.join()
+        assert len(timer_starts(vim)) == 1
+
+        ticker.wake()
+        assert timer_starts(vim)[-1].startswith('timer_start({},'.format(BUSY_INTERVAL))
+
+
+class TestNeovim:
+    @pytest.fixture
+    def vim(self):
+        return fake_vim(nvim=True)
+
+    def test_drains_once_per_wake_up(self, vim):
+        on_tick = mock.Mock()
+        ticker = Ticker(vim, on_tick)
+        ticker.wake()
+        ticker.wake()
+
+        drain, = [c[1][0] for c in vim.async_call.mock_calls]
+        drain()
+        on_tick.assert_called_once_with()
+
+        ticker.wake()
+        assert len(vim.async_call.mock_calls) == 2
+
+    def test_skips_clients_outside_scala_buffers(self, vim):
+        ticker = Ticker(vim, mock.Mock())
+        skipped = client(queued=True)
+        skipped.editor.is_buffer_ensime_compatible.return_value = False
+        assert not ticker.tick(skipped)
+        assert not skipped.tick.called
+
+        ticker.ticked([])
+        assert not vim.async_call.called
+
+    def test_keeps_draining_leftovers(self, vim):
+        ticker = Ticker(vim, mock.Mock())
+        ticker.ticked([client(queued=False)])
+        assert not vim.async_call.called
+
+        ticker.ticked([client(queued=True)])
+        assert vim.async_call.called
+
+
+def test_shows_usages_from_quickfix_window(tmpdir, monkeypatch):
+    monkeypatch.setattr('ensime_shared.protocol.USAGES_PAGE', 2)
+    monkeypatch.setattr('ensime_shared.client.USAGES_BATCH', 2)
+    launcher = mock.Mock(config={'name': 'test', 'root-dir': str(tmpdir),
+                                 'cache-dir': str(tmpdir.join('.ensime_cache'))})
+    client = EnsimeClientV2(mock.Mock(name='editor'), launcher)
+    client.editor.is_buffer_ensime_compatible.return_value = False  # In the qf window
+    client.call_options[1] = {'word_under_cursor': 'x'}
+    client.handle_source_positions(1, {'positions': [
+        {'position': {'file': 'A.scala', 'line': n}} for n in range(5)]})
+
+    vim = fake_vim(nvim=True)
+    ticker = Ticker(vim, mock.Mock())
+    drains = 0
+    while True:
+        ticked = [c for c in [client] if ticker.tick(c)]
+        ticker.ticked(ticked)
+        if not vim.async_call.called:
+            break
+        vim.async_call.reset_mock()
+        ticker._scheduled = False
+        drains += 1
+        assert drains < 10
+    client.teardown()
+
+    assert len(client.editor.append_quickfix_list.mock_calls) == 2
+    assert not client.has_backlog()
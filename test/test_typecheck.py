@@ -0,0 +1,69 @@
+# coding: utf-8
+
+import mock
+import pytest
+
+from ensime_shared.typecheck import TypecheckHandler
+
+
+@pytest.fixture
+def handler():
+    handler = TypecheckHandler()
+    handler.editor = mock.Mock(name='editor')
+    handler.log = mock.Mock(name='log')
+    handler.start_typechecking()
+    return handler
+
+
+def notes_event(*notes):
+    return {'typehint': 'NewJavaNotesEvent', 'isFull': False, 'notes': list(notes)}
+
+
+def test_coalesces_java_notes_until_displayed(handler):
+    handler.buffer_typechecks_and_display(None, notes_event('a', 'b'))
+    handler.buffer_typechecks_and_display(None, notes_event('c'))
+    assert not handler.editor.display_notes.called
+
+    handler.display_new_notes()
+    handler.editor.display_notes.assert_called_once_with(['a', 'b', 'c'])
+
+
+def test_displays_all_notes_of_typecheck_when_new_ones_come(handler):
+    handler.buffer_typechecks_and_display(None, notes_event('a'))
+    handler.display_new_notes()
+    handler.buffer_typechecks_and_display(None, notes_event('b'))
+    handler.display_new_notes()
+    handler.display_new_notes()
+
+    assert handler.editor.display_notes.call_args_list == [
+        mock.call(['a']),
+        mock.call(['a', 'b']),
+    ]
+
+
+def test_replaces_notes_of_previous_typecheck(handler):
+    handler.buffer_typechecks_and_display(None, notes_event('a', 'b'))
+    handler.display_new_notes()
+    handler.start_typechecking()
+    handler.buffer_typechecks_and_display(None, notes_event('b'))
+    handler.display_new_notes()
+
+    assert handler.editor.display_notes.call_args_list[-1] == mock.call(['b'])
+
+
+def test_clears_notes_once_errors_are_fixed(handler):
+    handler.buffer_typechecks_and_display(None, notes_event('a'))
+    handler.display_new_notes()
+    handler.start_typechecking()
+    handler.buffer_typechecks_and_display(None, notes_event())
+    handler.display_new_notes()
+
+    assert handler.editor.display_notes.call_args_list[-1] == mock.call([])
+
+
+def test_typecheck_complete_displays_all_notes(handler):
+    handler.buffer_typechecks_and_display(None, notes_event('a'))
+    handler.handle_typecheck_complete(None, {})
+    handler.display_new_notes()
+
+    handler.editor.display_notes.assert_called_once_with(['a'])
@@ -0,0 +1,54 @@
+# coding: utf-8
+
+from ensime_shared.usages import Usages
+
+
+def to_item(filename, lnum, text, tpe):
+    return (filename, lnum, text)
+
+
+def position(filename, line, preview=None):
+    p = {'position': {'file': filename, 'line': line}}
+    if preview is not None:
+        p['preview'] = preview
+    return p
+
+
+POSITIONS = [
+    position('b.scala', 3, 'b3'),
+    position('a.scala', 9, 'a9'),
+    position('b.scala', 1, 'b1'),
+    position('a.scala', 2),
+    position('a.scala', 9, 'a9 again'),
+]
+
+SORTED = [
+    ('a.scala', 2, '<no preview>'),
+    ('a.scala', 9, 'a9'),
+    ('a.scala', 9, 'a9 again'),
+    ('b.scala', 1, 'b1'),
+    ('b.scala', 3, 'b3'),
+]
+
+
+def test_hands_out_usages_sorted_by_file_and_line():
+    usages = Usages('Usages', POSITIONS, to_item)
+    assert usages.take(2) + usages.take(2) + usages.take(2) == SORTED
+    assert usages.shown == usages.total == 5
+    assert not usages.pending
+    assert not usages.truncated
+
+
+def test_stops_at_the_limit_until_asked_for_more():
+    usages = Usages('Usages', POSITIONS, to_item, limit=3)
+    assert usages.take(2) == SORTED[:2]
+    assert usages.take(2) == SORTED[2:3]
+    assert usages.truncated
+    assert usages.take(2) == []
+
+    usages.more(1)
+    assert usages.pending
+    assert usages.take(2) == SORTED[3:4]
+    usages.more()
+    assert usages.take(10) == SORTED[4:]
+    assert not usages.truncated